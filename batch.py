@@ -0,0 +1,186 @@
+"""Résolution en lot de paires (position vide initiale, cible finale).
+
+Les paires sont réparties sur un ProcessPoolExecutor (un processus par cœur)
+et chaque résultat est écrit dans un fichier JSON-lines dès qu'il est prêt :
+
+    python batch.py -o resultats.jsonl               # les 33 x 33 paires
+    python batch.py 3,3:3,3 2,3:2,3 -a gbfs          # une liste de paires
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack
+
+import search
+import vectorized
+from bitboard import GEOMETRIES, get_geometry
+from export import AsciiWriter, BinaryWriter
+from heuristics import HEURISTICS, get_heuristic
+from pruning import Pruner
+from transposition import TranspositionTable
+
+# layer et layerbeam (développement vectorisé, voir vectorized.py) demandent NumPy.
+ALGORITHMS = ("dfs", "bidir", "gbfs", "astar", "idastar", "beam", "wastar") + \
+    (("layer", "layerbeam") if vectorized.np is not None else ())
+
+
+def solve_pair(initial_empty, final_target, algorithm="dfs", node_limit=None, time_limit=None, heuristic_name="distance",
+               pruning=True, geometry_name="english", memory_limit=None, beam_width=1000, weight=2.0):
+    """Résout une paire et retourne son résultat sous forme de dictionnaire."""
+    state = get_geometry(geometry_name).start_state(*initial_empty)
+    result = solve_state(state, final_target, algorithm, node_limit, time_limit, heuristic_name, pruning, geometry_name,
+                         memory_limit, beam_width, weight)
+    return {"initial_empty": list(initial_empty), **result}
+
+
+def solve_state(state, final_target, algorithm="dfs", node_limit=None, time_limit=None, heuristic_name="distance",
+                pruning=True, geometry_name="english", memory_limit=None, beam_width=1000, weight=2.0):
+    """Résout depuis un état quelconque : répartiteur commun à batch, benchmark et service.
+
+    memory_limit (en octets) borne la mémoire de gbfs, astar et wastar, qui
+    débordent alors sur disque (voir external.py). beam_width et weight
+    règlent les modes approchés beam, layerbeam et wastar, dont la réponse
+    partielle est décrite par les clés pegs, distance, lower_bound et gap.
+    """
+    geometry = get_geometry(geometry_name)
+    goal = geometry.bit(*final_target)
+    explored_states = [0]
+    solution_moves = []
+    stats = {}
+
+    start_time = time.perf_counter()
+    pruner = Pruner(geometry, goal) if pruning else None
+    if algorithm == "dfs":
+        table = TranspositionTable(geometry, goal)
+        solved = search.dfs(geometry, state, goal, explored_states, solution_moves, table,
+                            node_limit=node_limit, time_limit=time_limit, pruner=pruner, stats=stats)
+    elif algorithm == "bidir":
+        table = TranspositionTable(geometry, goal)
+        solved = search.bidirectional_search(geometry, state, goal, explored_states, solution_moves, table, pruner,
+                                             node_limit=node_limit, time_limit=time_limit, stats=stats)
+    elif algorithm == "layer":
+        solved = vectorized.layer_search(geometry, state, goal, explored_states, solution_moves, pruner=pruner, stats=stats,
+                                         node_limit=node_limit, time_limit=time_limit)
+    else:
+        heuristic = get_heuristic(heuristic_name, geometry, final_target)
+        limits = {"node_limit": node_limit, "time_limit": time_limit}
+        if algorithm == "beam":
+            solved = search.beam_search(geometry, state, goal, heuristic, explored_states, solution_moves, beam_width,
+                                        pruner, stats, **limits)
+        elif algorithm == "layerbeam":
+            solved = vectorized.layer_search(geometry, state, goal, explored_states, solution_moves, beam_width, heuristic,
+                                             pruner, stats, **limits)
+        elif algorithm == "wastar":
+            solved = search.weighted_a_star(geometry, state, goal, heuristic, explored_states, solution_moves,
+                                            weight, pruner, stats, memory_limit=memory_limit, **limits)
+        else:
+            if algorithm == "idastar":
+                solver = search.ida_star_search
+            else:
+                solver = {"gbfs": search.greedy_best_first_search, "astar": search.a_star_search}[algorithm]
+                limits["memory_limit"] = memory_limit
+            solved = solver(geometry, state, goal, heuristic, explored_states, solution_moves, pruner, stats, **limits)
+    elapsed = time.perf_counter() - start_time
+
+    return {
+        "geometry": geometry_name,
+        "final_target": list(final_target),
+        "algorithm": algorithm,
+        "heuristic": heuristic_name if algorithm not in ("dfs", "bidir", "layer") else None,
+        "solved": solved,
+        "moves": [list(move) for move in solution_moves],
+        "explored_states": explored_states[0],
+        "frontier": stats.get("frontier", 0),
+        "stored": stats.get("stored", 0),
+        "pruned_states": pruner.pruned if pruner is not None else 0,
+        "rejected": bool(pruner is not None and pruner.rejected),
+        "time": round(elapsed, 6),
+        **{key: stats[key] for key in search.PARTIAL_KEYS if key in stats},
+    }
+
+
+def parse_pair(text):
+    """Lit une paire au format 'x,y:x,y'."""
+    try:
+        start, target = text.split(":")
+        pair = tuple(tuple(map(int, part.split(","))) for part in (start, target))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Paire invalide : {text!r} (format attendu : x,y:x,y)")
+    if any(len(cell) != 2 for cell in pair):
+        raise argparse.ArgumentTypeError(f"Paire invalide : {text!r} (format attendu : x,y:x,y)")
+    return pair
+
+
+def run_batch(pairs, output, algorithm="dfs", workers=None, node_limit=None, time_limit=None, heuristic_name="distance",
+              pruning=True, geometry_name="english", memory_limit=None, beam_width=1000, weight=2.0, binary_output=None,
+              text_output=None):
+    """Résout toutes les paires en parallèle et les écrit dans output au fil de l'eau.
+
+    Les solutions trouvées sont aussi exportées au format binaire dans
+    binary_output et dessinées coup par coup dans text_output (voir export.py).
+    Une paire dont la résolution échoue donne un enregistrement
+    (initial_empty, final_target, error) et le lot continue.
+    """
+    geometry = get_geometry(geometry_name)
+    with ExitStack() as stack:
+        pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+        file = stack.enter_context(open(output, "w"))
+        binary = BinaryWriter(stack.enter_context(open(binary_output, "wb")), geometry) if binary_output else None
+        text = AsciiWriter(stack.enter_context(open(text_output, "w")), geometry) if text_output else None
+        futures = {pool.submit(solve_pair, start, target, algorithm, node_limit, time_limit, heuristic_name, pruning,
+                               geometry_name, memory_limit, beam_width, weight): (start, target)
+                   for start, target in pairs}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as error:
+                # Une paire qui échoue (ou dont le processus meurt) ne doit pas arrêter le lot.
+                start, target = futures[future]
+                result = {"initial_empty": list(start), "final_target": list(target),
+                          "error": f"{type(error).__name__} : {error}"}
+            file.write(json.dumps(result) + "\n")
+            file.flush()
+            if result.get("solved"):
+                state = geometry.start_state(*result["initial_empty"])
+                if binary is not None:
+                    binary.write(state, result["final_target"], result["moves"])
+                if text is not None:
+                    text.write(state, result["moves"],
+                               f"{tuple(result['initial_empty'])} -> {tuple(result['final_target'])} :")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Résolution en lot du solitaire chinois.")
+    parser.add_argument("pairs", nargs="*", type=parse_pair,
+                        help="paires 'x,y:x,y' (position vide initiale:cible finale) ; toutes les paires du plateau si absentes")
+    parser.add_argument("-o", "--output", default="resultats.jsonl", help="fichier JSON-lines des résultats")
+    parser.add_argument("--binary", help="exporte aussi les solutions au format binaire dans ce fichier")
+    parser.add_argument("--ascii", help="dessine aussi les solutions coup par coup dans ce fichier texte")
+    parser.add_argument("-g", "--geometry", choices=GEOMETRIES, default="english", help="plateau")
+    parser.add_argument("-a", "--algorithm", choices=ALGORITHMS, default="dfs")
+    parser.add_argument("--heuristic", choices=HEURISTICS, default="distance", help="heuristique de gbfs, astar et idastar")
+    parser.add_argument("--no-pruning", dest="pruning", action="store_false",
+                        help="désactive l'élagage par classes de position et pagodes")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(), help="nombre de processus")
+    parser.add_argument("--node-limit", type=int, help="budget d'états explorés par paire")
+    parser.add_argument("--time-limit", type=float, help="budget en secondes par paire")
+    parser.add_argument("--memory-limit", type=float, help="budget mémoire en Mio par paire (gbfs et astar, débordement sur disque)")
+    parser.add_argument("--beam-width", type=int, default=1000, help="largeur du faisceau (beam, layerbeam)")
+    parser.add_argument("--weight", type=float, default=2.0, help="poids de l'heuristique (wastar)")
+    args = parser.parse_args(argv)
+
+    geometry = GEOMETRIES[args.geometry]
+    for pair in args.pairs:
+        if any(cell not in geometry.index for cell in pair):
+            parser.error(f"Position hors de la zone jouable : {pair}")
+    pairs = args.pairs or [(start, target) for start in geometry.cells for target in geometry.cells]
+    memory_limit = int(args.memory_limit * 2**20) if args.memory_limit is not None else None
+    run_batch(pairs, args.output, args.algorithm, args.workers, args.node_limit, args.time_limit, args.heuristic,
+              args.pruning, args.geometry, memory_limit, args.beam_width, args.weight, args.binary, args.ascii)
+
+
+if __name__ == "__main__":
+    main()
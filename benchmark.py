@@ -0,0 +1,161 @@
+"""Banc d'essai des solveurs sur un corpus fixe de paires.
+
+Chaque couple (cas, algorithme) est résolu repeat fois et chronométré avec
+perf_counter ; une exécution de plus, sous tracemalloc, mesure le pic
+mémoire (tracemalloc ralentit trop l'exécution pour chronométrer en même
+temps). Les mesures sont écrites en JSON et peuvent être comparées à une
+référence enregistrée :
+
+    python benchmark.py -o reference.json
+    python benchmark.py --baseline reference.json    # code de sortie 1 si régression
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from batch import ALGORITHMS, solve_pair
+
+HEURISTIC = {"gbfs": "distance", "astar": "pagoda", "idastar": "pagoda", "beam": "distance", "wastar": "distance",
+             "layerbeam": "distance"}
+
+# (nom, catégorie, géométrie, position vide initiale, cible finale, algorithmes)
+CORPUS = (
+    ("triangle", "facile", "triangle", (0, 0), (0, 0), ALGORITHMS),
+    ("anglais-3-2", "facile", "english", (3, 2), (3, 2), tuple(algorithm for algorithm in ALGORITHMS if algorithm != "layer")),
+    ("anglais-2-3-5-3", "difficile", "english", (2, 3), (5, 3), ("dfs", "bidir", "gbfs", "astar")),
+    ("triangle-3-1", "insoluble", "triangle", (3, 1), (3, 1), ALGORITHMS),
+    ("anglais-centre-coin", "rejetée", "english", (3, 3), (0, 2), ALGORITHMS),
+    ("francais-centre", "rejetée", "french", (3, 3), (3, 3), ALGORITHMS),
+)
+
+# Les paires « rejetées » sont écartées par les classes de position avant
+# toute recherche : elles ne mesurent que ce test. triangle-3-1 passe les
+# classes et les pagodes mais n'a pas de solution : la recherche doit
+# épuiser l'arbre.
+
+# En dessous de MIN_TIME secondes d'écart (ou de MIN_MEMORY octets), une
+# différence de temps (ou de mémoire) est du bruit et n'est jamais une régression.
+MIN_TIME = 0.05
+MIN_MEMORY = 2**20
+
+
+def measure(case, algorithm, repeat=3, node_limit=None, time_limit=None):
+    """Mesures d'un algorithme sur un cas du corpus."""
+    name, category, geometry, initial_empty, final_target, _ = case
+    heuristic = HEURISTIC.get(algorithm, "distance")
+
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = solve_pair(initial_empty, final_target, algorithm, node_limit, time_limit, heuristic,
+                            geometry_name=geometry)
+        times.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    solve_pair(initial_empty, final_target, algorithm, node_limit, time_limit, heuristic, geometry_name=geometry)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    median = statistics.median(times)
+    return {
+        "case": name,
+        "category": category,
+        "algorithm": algorithm,
+        "heuristic": result["heuristic"],
+        "solved": result["solved"],
+        "solution_length": len(result["moves"]),
+        "explored_states": result["explored_states"],
+        "frontier": result["frontier"],
+        "stored": result["stored"],
+        "time": round(median, 6),
+        "time_min": round(min(times), 6),
+        "nodes_per_sec": round(result["explored_states"] / median) if median else 0,
+        "peak_memory": peak,
+    }
+
+
+def run_benchmark(cases=CORPUS, algorithms=ALGORITHMS, repeat=3, node_limit=None, time_limit=None, verbose=False):
+    """Mesure chaque algorithme retenu sur chaque cas et retourne le rapport."""
+    results = []
+    for case in cases:
+        for algorithm in case[5]:
+            if algorithm not in algorithms:
+                continue
+            entry = measure(case, algorithm, repeat, node_limit, time_limit)
+            if verbose:
+                print(f"{entry['case']:<22} {algorithm:<8} {entry['time']:>9.4f} s {entry['nodes_per_sec']:>9} états/s "
+                      f"{entry['peak_memory'] / 2**20:>8.1f} Mio  {entry['solution_length']:>2} coups")
+            results.append(entry)
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(report, baseline, tolerance=0.25, min_time=MIN_TIME, min_memory=MIN_MEMORY):
+    """Régressions de report par rapport à baseline.
+
+    Le résultat, le nombre d'états explorés et la longueur de la solution
+    sont déterministes : tout changement compte (sauf pour une recherche
+    interrompue, dont le nombre d'états dépend de la machine). Le temps et
+    la mémoire ne comptent qu'au-delà de tolerance en relatif et de
+    min_time / min_memory en absolu.
+    """
+    reference = {(entry["case"], entry["algorithm"]): entry for entry in baseline["results"]}
+    regressions = []
+    for entry in report["results"]:
+        old = reference.get((entry["case"], entry["algorithm"]))
+        if old is None:
+            continue
+        label = f"{entry['case']} / {entry['algorithm']}"
+        if entry["solved"] != old["solved"]:
+            regressions.append(f"{label} : résultat {old['solved']} -> {entry['solved']}")
+        elif entry["solved"] is not None:
+            for key in ("explored_states", "solution_length"):
+                if entry[key] != old[key]:
+                    regressions.append(f"{label} : {key} {old[key]} -> {entry[key]}")
+        for key, floor in (("time", min_time), ("peak_memory", min_memory)):
+            if old[key] and entry[key] > old[key] * (1 + tolerance) and entry[key] - old[key] > floor:
+                regressions.append(f"{label} : {key} {old[key]} -> {entry[key]} (+{entry[key] / old[key] - 1:.0%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc d'essai des solveurs du solitaire chinois.")
+    parser.add_argument("-o", "--output", default="benchmark.json", help="fichier JSON des mesures")
+    parser.add_argument("--baseline", help="mesures de référence à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="écart relatif toléré sur le temps et la mémoire")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME, help="écart de temps en secondes toujours toléré")
+    parser.add_argument("-a", "--algorithm", dest="algorithms", action="append", choices=ALGORITHMS,
+                        help="algorithme à mesurer (répétable ; tous par défaut)")
+    parser.add_argument("--case", dest="cases", action="append", choices=[case[0] for case in CORPUS],
+                        help="cas du corpus à mesurer (répétable ; tous par défaut)")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="exécutions chronométrées par mesure")
+    parser.add_argument("--node-limit", type=int, help="budget d'états explorés par exécution")
+    parser.add_argument("--time-limit", type=float, help="budget en secondes par exécution")
+    args = parser.parse_args(argv)
+
+    cases = [case for case in CORPUS if not args.cases or case[0] in args.cases]
+    report = run_benchmark(cases, args.algorithms or ALGORITHMS, args.repeat, args.node_limit, args.time_limit,
+                           verbose=True)
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(report, json.load(file), args.tolerance, args.min_time)
+        for regression in regressions:
+            print(f"RÉGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
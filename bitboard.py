@@ -0,0 +1,239 @@
+"""Moteur d'états en bitboard pour le solitaire chinois.
+
+Chaque trou jouable du plateau correspond à un bit d'un entier : un état est
+donc un simple ``int``, hachable et immuable, que les recherches manipulent
+sans copier de listes. Un saut (départ, sautée, arrivée) est décrit par des
+masques précalculés et s'applique, comme il s'annule, par un XOR.
+"""
+
+ENGLISH_LAYOUT = (
+    (-1, -1, 1, 1, 1, -1, -1),
+    (-1, -1, 1, 1, 1, -1, -1),
+    (1, 1, 1, 1, 1, 1, 1),
+    (1, 1, 1, 1, 1, 1, 1),
+    (1, 1, 1, 1, 1, 1, 1),
+    (-1, -1, 1, 1, 1, -1, -1),
+    (-1, -1, 1, 1, 1, -1, -1),
+)
+
+FRENCH_LAYOUT = (
+    (-1, -1, 1, 1, 1, -1, -1),
+    (-1, 1, 1, 1, 1, 1, -1),
+    (1, 1, 1, 1, 1, 1, 1),
+    (1, 1, 1, 1, 1, 1, 1),
+    (1, 1, 1, 1, 1, 1, 1),
+    (-1, 1, 1, 1, 1, 1, -1),
+    (-1, -1, 1, 1, 1, -1, -1),
+)
+
+# Croix 9x9 à bras de largeur 3 (45 trous) et losange 9x9 (41 trous).
+CROSS9_LAYOUT = tuple(tuple(1 if 3 <= x <= 5 or 3 <= y <= 5 else -1 for y in range(9)) for x in range(9))
+DIAMOND_LAYOUT = tuple(tuple(1 if abs(x - 4) + abs(y - 4) <= 4 else -1 for y in range(9)) for x in range(9))
+
+DIRECTIONS = ((-2, 0), (2, 0), (0, -2), (0, 2))
+
+# Plateaux triangulaires : la ligne x compte x + 1 trous, alignés à gauche,
+# et l'on saute aussi le long de la diagonale.
+TRIANGULAR_DIRECTIONS = DIRECTIONS + ((-2, -2), (2, 2))
+
+
+def triangle_layout(rows):
+    """Disposition d'un plateau triangulaire de rows lignes."""
+    return tuple(tuple(1 if y <= x else -1 for y in range(rows)) for x in range(rows))
+
+
+# Les 8 symétries du carré (rotations et réflexions), sur des coordonnées
+# centrées.
+DIHEDRAL = (
+    lambda x, y: (x, y),
+    lambda x, y: (y, -x),
+    lambda x, y: (-x, -y),
+    lambda x, y: (-y, x),
+    lambda x, y: (x, -y),
+    lambda x, y: (-x, y),
+    lambda x, y: (y, x),
+    lambda x, y: (-y, -x),
+)
+
+
+class Geometry:
+    """Tables précalculées d'une géométrie de plateau (trous et sauts)."""
+
+    def __init__(self, layout, directions=DIRECTIONS):
+        self.layout = [list(row) for row in layout]
+        self.rows = len(layout)
+        self.cols = len(layout[0])
+        self.cells = [(x, y) for x in range(self.rows) for y in range(self.cols) if layout[x][y] != -1]
+        self.index = {cell: i for i, cell in enumerate(self.cells)}
+        self.size = len(self.cells)
+        self.full = (1 << self.size) - 1
+
+        # Chaque saut est un triplet (masque, prérequis, coup) : le coup est
+        # jouable si state & masque == prérequis (départ et sautée pleins,
+        # arrivée vide) et s'applique par state ^ masque. L'ordre suit celui
+        # de l'ancien get_possible_moves pour conserver le parcours de la DFS.
+        self.moves = []
+        for x1, y1 in self.cells:
+            for dx, dy in directions:
+                x2, y2 = x1 + dx, y1 + dy
+                over = (x1 + dx // 2, y1 + dy // 2)
+                if (x2, y2) in self.index and over in self.index:
+                    src = 1 << self.index[(x1, y1)]
+                    mid = 1 << self.index[over]
+                    dst = 1 << self.index[(x2, y2)]
+                    self.moves.append((src | mid | dst, src | mid, (x1, y1, x2, y2)))
+
+        # Les mêmes sauts, regroupés par trou d'arrivée : un saut n'est jouable
+        # que vers un trou vide, il suffit donc de parcourir les trous vides.
+        self.jumps = {entry[2]: entry for entry in self.moves}
+
+        self.moves_into = [[] for _ in self.cells]
+        for entry in self.moves:
+            self.moves_into[(entry[0] ^ entry[1]).bit_length() - 1].append(entry)
+
+        # Symétries du plateau : permutation des trous (permutations) et tables
+        # par octet de la même permutation (symmetries), avec lesquelles
+        # transformer un état coûte une recherche par octet.
+        self.symmetries = []
+        self.permutations = []
+        if self.rows == self.cols:
+            for sym in DIHEDRAL:
+                perm = self._permutation(sym)
+                if perm is not None:
+                    self.permutations.append(perm)
+                    self.symmetries.append(self.byte_tables([1 << i for i in perm]))
+
+    def _permutation(self, sym):
+        """Permutation des trous induite par sym, ou None si sym ne préserve pas le plateau et ses sauts."""
+        half = self.rows - 1
+        perm = []
+        for x, y in self.cells:
+            u, v = sym(2 * x - half, 2 * y - half)
+            image = ((u + half) // 2, (v + half) // 2)
+            if image not in self.index:
+                return None
+            perm.append(self.index[image])
+        masks = {mask for mask, _, _ in self.moves}
+        for mask in masks:
+            image = 0
+            for i in range(self.size):
+                if mask >> i & 1:
+                    image |= 1 << perm[i]
+            if image not in masks:
+                return None
+        return perm
+
+    def byte_tables(self, values):
+        """Tables (une par octet de l'état) donnant la somme des values des bits de chaque valeur d'octet."""
+        tables = []
+        for base in range(0, self.size, 8):
+            table = []
+            for byte in range(256):
+                total = 0
+                for bit in range(8):
+                    if byte >> bit & 1 and base + bit < self.size:
+                        total += values[base + bit]
+                table.append(total)
+            tables.append(table)
+        return tables
+
+    def lookup(self, state, tables):
+        """Somme, pour les trous occupés de state, des valeurs ayant servi à construire tables."""
+        total = 0
+        for table in tables:
+            total += table[state & 0xFF]
+            state >>= 8
+        return total
+
+    def transform(self, state, symmetry):
+        """Applique à state une symétrie de self.symmetries."""
+        return self.lookup(state, symmetry)
+
+    def bit(self, x, y):
+        """Retourne le masque du trou (x, y)."""
+        return 1 << self.index[(x, y)]
+
+    def start_state(self, x, y):
+        """Retourne l'état initial : tous les trous pleins sauf (x, y)."""
+        return self.full ^ self.bit(x, y)
+
+    def encode(self, board):
+        """Convertit un plateau liste de listes en entier."""
+        state = 0
+        for i, (x, y) in enumerate(self.cells):
+            if board[x][y] == 1:
+                state |= 1 << i
+        return state
+
+    def decode(self, state):
+        """Convertit un entier en plateau liste de listes."""
+        board = [row[:] for row in self.layout]
+        for i, (x, y) in enumerate(self.cells):
+            board[x][y] = (state >> i) & 1
+        return board
+
+    def possible_moves(self, state):
+        """Retourne la liste des sauts (masque, prérequis, coup) jouables depuis state."""
+        return list(self.iter_moves(state))
+
+    def iter_moves(self, state):
+        """Génère les sauts (masque, prérequis, coup) jouables depuis state.
+
+        Tant que les trous vides sont minoritaires, seuls les sauts qui y
+        arrivent sont examinés ; au-delà, le parcours de la table complète
+        revient moins cher.
+        """
+        holes = self.full ^ state
+        if holes.bit_count() * 2 > self.size:
+            for entry in self.moves:
+                if state & entry[0] == entry[1]:
+                    yield entry
+            return
+        while holes:
+            low = holes & -holes
+            for entry in self.moves_into[low.bit_length() - 1]:
+                if state & entry[0] == entry[1]:
+                    yield entry
+            holes ^= low
+
+    def scored_moves(self, weights):
+        """Sauts (masque, prérequis, indice dans self.moves, variation de weigh() due au saut)."""
+        index = self.index
+        return [
+            (mask, pre, i, weights[index[move[2], move[3]]]
+             - weights[index[move[0], move[1]]]
+             - weights[index[(move[0] + move[2]) // 2, (move[1] + move[3]) // 2]])
+            for i, (mask, pre, move) in enumerate(self.moves)
+        ]
+
+    def weigh(self, state, weights):
+        """Somme des poids des trous occupés de state."""
+        total = 0
+        while state:
+            low = state & -state
+            total += weights[low.bit_length() - 1]
+            state ^= low
+        return total
+
+
+ENGLISH = Geometry(ENGLISH_LAYOUT)
+
+# Géométries prêtes à l'emploi : chacune a ses propres tables de sauts et un
+# état de la largeur de son nombre de trous (un int Python n'a pas de
+# limite : au-delà de 64 trous, seuls les tableaux "Q" de NodeStore, de
+# parallel.py et de retrograde.py sont hors jeu).
+GEOMETRIES = {
+    "english": ENGLISH,
+    "french": Geometry(FRENCH_LAYOUT),
+    "cross9": Geometry(CROSS9_LAYOUT),
+    "diamond": Geometry(DIAMOND_LAYOUT),
+    "triangle": Geometry(triangle_layout(5), TRIANGULAR_DIRECTIONS),
+}
+
+
+def get_geometry(name):
+    """Retourne la géométrie enregistrée sous name."""
+    try:
+        return GEOMETRIES[name]
+    except KeyError:
+        raise ValueError(f"Géométrie inconnue : {name!r} (disponibles : {', '.join(GEOMETRIES)})") from None
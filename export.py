@@ -0,0 +1,100 @@
+"""Export en flux des solutions.
+
+iter_records() rejoue une solution sur l'état entier (voir bitboard.py),
+sans toucher au plateau d'une instance, et produit un enregistrement
+compact par coup. Les writers le consomment :
+
+- JsonLinesWriter : une ligne JSON par solution ;
+- BinaryWriter : un en-tête puis, par solution, l'état initial, la cible,
+  le nombre de coups et 4 octets par coup (x1, y1, x2, y2), relus par
+  read_binary() ;
+- AsciiWriter : le plateau dessiné après chaque coup, pour un humain.
+
+Seul le rendu ASCII construit une chaîne par coup.
+"""
+
+import json
+import struct
+
+MAGIC = b"SOLMV1\0\0"
+HEADER = struct.Struct("<8sH")  # magique, nombre de trous
+SOLUTION = struct.Struct("<BH")  # indice du trou cible, nombre de coups
+MOVE = struct.Struct("<BBBB")
+
+
+def iter_records(geometry, state, moves):
+    """Enregistrements (numéro du coup, x1, y1, x2, y2, état après le coup) de moves joués depuis state."""
+    jumps = geometry.jumps
+    for step, move in enumerate(moves, 1):
+        try:
+            mask, pre, _ = jumps[tuple(move)]
+        except KeyError:
+            raise ValueError(f"Coup {step} invalide : {move}") from None
+        if state & mask != pre:
+            raise ValueError(f"Coup {step} injouable : {move}")
+        state ^= mask
+        yield (step, *move, state)
+
+
+def render(geometry, state):
+    """Dessin ASCII d'un état, comme draw_board()."""
+    board = geometry.decode(state)
+    return "\n".join(" ".join("." if cell == -1 else "O" if cell == 1 else " " for cell in row) for row in board)
+
+
+class JsonLinesWriter:
+    """Une ligne JSON par solution : les champs fournis, puis les coups et les billes restantes."""
+
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, geometry, state, moves, **fields):
+        moves = [record[1:5] for record in iter_records(geometry, state, moves)]
+        pegs = state.bit_count() - len(moves)
+        self.file.write(json.dumps({**fields, "moves": moves, "pegs": pegs}) + "\n")
+
+
+class BinaryWriter:
+    """Solutions au format binaire à largeur fixe (voir read_binary())."""
+
+    def __init__(self, file, geometry):
+        self.file = file
+        self.geometry = geometry
+        self.state_bytes = (geometry.size + 7) // 8
+        file.write(HEADER.pack(MAGIC, geometry.size))
+
+    def write(self, state, target, moves):
+        geometry = self.geometry
+        buffer = bytearray(MOVE.size * len(moves))
+        for step, x1, y1, x2, y2, _ in iter_records(geometry, state, moves):
+            MOVE.pack_into(buffer, (step - 1) * MOVE.size, x1, y1, x2, y2)
+        self.file.write(state.to_bytes(self.state_bytes, "little"))
+        self.file.write(SOLUTION.pack(geometry.index[tuple(target)], len(moves)))
+        self.file.write(buffer)
+
+
+def read_binary(file, geometry):
+    """Relit un fichier de BinaryWriter : génère (état initial, cible, coups)."""
+    magic, size = HEADER.unpack(file.read(HEADER.size))
+    if magic != MAGIC or size != geometry.size:
+        raise ValueError("Ce fichier n'est pas un export binaire de solutions pour ce plateau.")
+    state_bytes = (size + 7) // 8
+    while chunk := file.read(state_bytes):
+        state = int.from_bytes(chunk, "little")
+        target, count = SOLUTION.unpack(file.read(SOLUTION.size))
+        moves = list(MOVE.iter_unpack(file.read(MOVE.size * count)))
+        yield state, geometry.cells[target], moves
+
+
+class AsciiWriter:
+    """Évolution du plateau en texte, dans le format de log_moves()."""
+
+    def __init__(self, file, geometry):
+        self.file = file
+        self.geometry = geometry
+
+    def write(self, state, moves, title="Plateau initial :"):
+        file = self.file
+        file.write(f"{title}\n{render(self.geometry, state)}\n")
+        for _, x1, y1, x2, y2, after in iter_records(self.geometry, state, moves):
+            file.write(f"\nMouvement: {x1, y1} -> {x2, y2}\n{render(self.geometry, after)}\n")
@@ -0,0 +1,284 @@
+"""Mémoire externe des recherches best-first (GBFS et A*).
+
+Avec un budget mémoire, la recherche estime régulièrement la taille de son
+tas, de son ensemble d'états développés et de son NodeStore. Au-delà du
+budget, elle déverse tout sur disque et repart avec le meilleur morceau de
+la frontière :
+
+- les nœuds du NodeStore vont dans l'archive (parent global et saut), qui
+  ne sert plus qu'à reconstruire le chemin de la solution ;
+- la frontière, triée par (priorité, ordre de création), devient un
+  fichier d'enregistrements (priorité, origine, état, profondeur, nœud
+  archivé) ; l'origine est l'indice global du nœud à sa création, gardé
+  quand il est rechargé, pour que les priorités égales restent départagées
+  comme sans déversement ;
+- les états développés deviennent un fichier trié d'uint64, projeté en
+  mémoire et interrogé par dichotomie ; au-delà de MAX_RUNS fichiers, ils
+  sont fusionnés (fusion externe triée, doublons éliminés).
+
+Un nœud rechargé en mémoire est un alias de son nœud archivé : son parent
+vaut -(indice archivé) - 2 et il n'ajoute aucun saut au chemin. Les nœuds
+rechargés attendent dans un tas à part, trié par (priorité, origine) : à
+priorité égale, ils passent avant les nœuds créés depuis le déversement,
+comme leur origine plus ancienne le veut.
+"""
+
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from bisect import bisect_left
+from heapq import heappop, heappush, merge
+
+NODE_BITS = 32
+NODE_MASK = (1 << NODE_BITS) - 1
+NO_JUMP = 0xFFFF
+MAX_RUNS = 8
+RECORD = struct.Struct("<qQQBQ")  # priorité, origine, état, profondeur, nœud archivé
+
+# Octets par élément, mesurés avec tracemalloc (entier Python et case de
+# liste pour le tas, entier et case de table de hachage pour les états
+# développés, tableaux du NodeStore).
+HEAP_BYTES = 48
+CLOSED_BYTES = 72
+NODE_BYTES = 19
+
+
+def _read_records(path, record):
+    """Enregistrements d'un fichier, lus par blocs."""
+    with open(path, "rb") as file:
+        while chunk := file.read(record.size * 4096):
+            yield from record.iter_unpack(chunk)
+
+
+def _read_states(path):
+    """États d'un fichier d'uint64, lus par blocs."""
+    with open(path, "rb") as file:
+        while True:
+            chunk = array("Q")
+            try:
+                chunk.fromfile(file, 65536)
+            except EOFError:
+                yield from chunk
+                return
+            yield from chunk
+
+
+class Archive:
+    """Parents (indices globaux) et sauts des nœuds déversés, pour reconstruire les chemins."""
+
+    def __init__(self, directory):
+        self.parents_path = os.path.join(directory, "parents")
+        self.jumps_path = os.path.join(directory, "jumps")
+        open(self.parents_path, "wb").close()
+        open(self.jumps_path, "wb").close()
+        self.count = 0
+
+    def append(self, nodes):
+        """Archive les nœuds en mémoire de nodes ; retourne l'indice global du premier."""
+        base = self.count
+        parents = array("q", (parent + base if parent >= 0 else -parent - 2 if parent < -1 else -1
+                              for parent in nodes.parents))
+        jumps = array("H", (NO_JUMP if parent < -1 else jump for parent, jump in zip(nodes.parents, nodes.jumps)))
+        with open(self.parents_path, "ab") as file:
+            parents.tofile(file)
+        with open(self.jumps_path, "ab") as file:
+            jumps.tofile(file)
+        self.count += len(parents)
+        return base
+
+    def path(self, node):
+        """Indices des sauts menant de la racine au nœud archivé, du nœud vers la racine."""
+        jumps = []
+        with open(self.parents_path, "rb") as parents, open(self.jumps_path, "rb") as moves:
+            while True:
+                parents.seek(8 * node)
+                parent = array("q", parents.read(8))[0]
+                if parent == -1:
+                    return jumps
+                moves.seek(2 * node)
+                jump = array("H", moves.read(2))[0]
+                if jump != NO_JUMP:
+                    jumps.append(jump)
+                node = parent
+
+
+class ExternalMemory:
+    """Budget mémoire d'une recherche best-first et fichiers où elle déborde."""
+
+    def __init__(self, geometry, nodes, visited, memory_limit, directory=None, weights=None):
+        if geometry.size > 64:
+            raise ValueError("Le déversement sur disque ne gère que les plateaux d'au plus 64 trous.")
+        self.geometry = geometry
+        self.nodes = nodes
+        self.visited = visited
+        self.memory_limit = memory_limit
+        self.keep = max(1024, memory_limit // 8 // (HEAP_BYTES + NODE_BYTES))
+        self.temporary = tempfile.TemporaryDirectory(prefix="solitaire-", dir=directory, ignore_cleanup_errors=True)
+        self.directory = self.temporary.name
+        self.archive = Archive(self.directory)
+        self.files = 0
+        self.heads = []
+        self.restored = []
+        self.runs = {}
+        self.closed_runs = []
+        self.closed = 0
+        self.frontier = 0
+        self.spills = 0
+        self.weights = weights
+        self.partial = None
+
+    def full(self, pq):
+        """Indique si l'estimation de la mémoire en cours dépasse le budget."""
+        used = ((len(pq) + len(self.restored)) * HEAP_BYTES + len(self.visited) * CLOSED_BYTES
+                + len(self.nodes.states) * NODE_BYTES)
+        return used > self.memory_limit
+
+    def spill(self, pq, current):
+        """Déverse le NodeStore, la frontière (sauf ses keep meilleurs nœuds) et les états développés.
+
+        current est le nœud en cours de développement : il est recréé en
+        mémoire et son nouvel indice est retourné. Les nœuds de pq sont
+        nés depuis le déversement précédent : leur origine est leur indice
+        global.
+        """
+        nodes, visited = self.nodes, self.visited
+        self.spills += 1
+        states, depths = nodes.states, nodes.depths
+        base = self.archive.append(nodes)
+        if self.weights is not None:
+            self.keep_partial(base)
+        frontier = [(entry >> NODE_BITS, base + (entry & NODE_MASK), entry & NODE_MASK) for entry in pq]
+        frontier.extend(self.restored)
+        frontier.sort()
+        frontier = [(priority, origin, states[node], depths[node], base + node) for priority, origin, node in frontier]
+        current = (0, 0, states[current], depths[current], base + current)
+        nodes.archive = self.archive
+        nodes.archived += sum(1 for parent in nodes.parents if parent >= -1)
+        del states[:], nodes.parents[:], nodes.jumps[:], depths[:]
+
+        current = self.restore(current)[2]
+        pq.clear()
+        self.restored = [self.restore(record) for record in frontier[:self.keep]]
+        if len(frontier) > self.keep:
+            self.add_run(frontier[self.keep:])
+            if len(self.runs) > MAX_RUNS:
+                self.add_run(self.drain())
+
+        if visited:
+            self.add_closed_run(sorted(visited))
+            visited.clear()
+            if len(self.closed_runs) > MAX_RUNS:
+                runs, self.closed_runs = self.closed_runs, []
+                self.closed = 0
+                self.add_closed_run(_unique(merge(*(_read_states(path) for path, _, _ in runs))))
+                for path, mapping, view in runs:
+                    view.release()
+                    mapping.close()
+                    os.remove(path)
+        return current
+
+    def keep_partial(self, base):
+        """Retient le meilleur nœud à déverser pour search.report_partial() : le plus profond, puis le plus près de la cible."""
+        states, depths = self.nodes.states, self.nodes.depths
+        deepest = max(depths)
+        weigh = self.geometry.weigh
+        node = min((node for node, depth in enumerate(depths) if depth == deepest),
+                   key=lambda node: weigh(states[node], self.weights))
+        candidate = (-deepest, weigh(states[node], self.weights), states[node], base + node)
+        if self.partial is None or candidate[:2] < self.partial[:2]:
+            self.partial = candidate
+
+    def restore(self, record):
+        """Recrée en mémoire un nœud déversé (alias de son nœud archivé) et retourne son entrée (priorité, origine, nœud)."""
+        priority, origin, state, depth, node = record
+        return priority, origin, self.nodes.add(state, -node - 2, 0, depth)
+
+    def new_path(self):
+        self.files += 1
+        return os.path.join(self.directory, f"run{self.files}")
+
+    def add_run(self, records):
+        """Écrit une suite triée d'enregistrements de frontière et place sa tête parmi les têtes."""
+        path = self.new_path()
+        count = 0
+        with open(path, "wb") as file:
+            for record in records:
+                file.write(RECORD.pack(*record))
+                count += 1
+        reader = _read_records(path, RECORD)
+        self.runs[path] = reader
+        self.frontier += count
+        heappush(self.heads, (next(reader), path))
+
+    def drain(self):
+        """Vide tous les fichiers de frontière dans l'ordre (fusion de leurs têtes)."""
+        while self.heads:
+            yield self.next_record()
+
+    def next_record(self):
+        """Meilleur enregistrement déversé, retiré de son fichier."""
+        record, path = heappop(self.heads)
+        self.frontier -= 1
+        following = next(self.runs[path], None)
+        if following is None:
+            del self.runs[path]
+            os.remove(path)
+        else:
+            heappush(self.heads, (following, path))
+        return record
+
+    def add_closed_run(self, states):
+        """Écrit une suite triée d'états développés et la projette en mémoire."""
+        path = self.new_path()
+        with open(path, "wb") as file:
+            chunk = array("Q")
+            for state in states:
+                chunk.append(state)
+                if len(chunk) == 65536:
+                    chunk.tofile(file)
+                    del chunk[:]
+            chunk.tofile(file)
+        with open(path, "rb") as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapping).cast("Q")
+        self.closed_runs.append((path, mapping, view))
+        self.closed += len(view)
+
+    def waiting(self):
+        """Nombre de nœuds de frontière hors de pq : rechargés ou dans les fichiers."""
+        return len(self.restored) + self.frontier
+
+    def pop(self, pq):
+        """heappop sur toute la frontière : pq, les nœuds rechargés et les têtes des fichiers.
+
+        À priorité égale, l'origine la plus ancienne passe d'abord ; les
+        nœuds de pq, nés depuis le dernier déversement, sont les plus récents.
+        """
+        restored, heads = self.restored, self.heads
+        if heads and (not restored or heads[0][0][:2] < restored[0][:2]):
+            heappush(restored, self.restore(self.next_record()))
+        if restored and (not pq or restored[0][0] <= pq[0] >> NODE_BITS):
+            priority, _, node = heappop(restored)
+            return priority << NODE_BITS | node
+        return heappop(pq)
+
+    def seen(self, state):
+        """Indique si state a déjà été développé (en mémoire ou dans un fichier)."""
+        if state in self.visited:
+            return True
+        for _, _, view in self.closed_runs:
+            i = bisect_left(view, state)
+            if i < len(view) and view[i] == state:
+                return True
+        return False
+
+
+def _unique(states):
+    """Élimine les doublons consécutifs d'une suite triée."""
+    previous = None
+    for state in states:
+        if state != previous:
+            yield state
+            previous = state
@@ -1,40 +1,80 @@
 import time
-from heapq import heappush, heappop
+
+import export
+import history
+import parallel
+import retrograde
+import search
+import vectorized
+from bitboard import ENGLISH
+from heuristics import get_heuristic
+from pruning import Pruner
+from transposition import TranspositionTable
 
 class SolitaireChinois:
-    def __init__(self, final_target=None):
-
-        self.board = [
-            [-1, -1, 1, 1, 1, -1, -1],
-            [-1, -1, 1, 1, 1, -1, -1],
-            [1, 1, 1, 1, 1, 1, 1],
-            [1, 1, 1, 1, 1, 1, 1],
-            [1, 1, 1, 1, 1, 1, 1],
-            [-1, -1, 1, 1, 1, -1, -1],
-            [-1, -1, 1, 1, 1, -1, -1],
-        ]
-
-        self.initial_empty = self.get_initial_empty_position()
-        self.final_target = final_target or self.initial_empty
-        self.board[self.initial_empty[0]][self.initial_empty[1]] = 0
+    DEFAULT_HEURISTICS = {"gbfs": "center", "astar": "center", "idastar": "pagoda", "beam": "center", "wastar": "center",
+                          "layerbeam": "center"}
+
+    def __init__(self, final_target=None, geometry=ENGLISH, initial_empty=None, board=None):
+        """Without initial_empty or board, the empty cell is asked for on the keyboard.
+
+        board (list of lists: 1 marble, 0 empty hole, -1 off the board)
+        replaces the initial empty cell; final_target defaults to
+        initial_empty.
+        """
+        self.geometry = geometry
+        if initial_empty is None and board is None:
+            initial_empty = self.get_initial_empty_position()
+        if board is None and tuple(initial_empty) not in geometry.index:
+            raise ValueError(f"Initial empty cell outside the playable area: {initial_empty}")
+        if final_target is None:
+            final_target = initial_empty
+        if final_target is None:
+            raise ValueError("final_target is required with board.")
+        if tuple(final_target) not in geometry.index:
+            raise ValueError(f"Invalid final target: {final_target}")
+        self.initial_empty = initial_empty
+        self.final_target = tuple(final_target)
+        if board is not None:
+            self.initial_board = self.validate_board(board)
+        else:
+            self.initial_board = geometry.decode(geometry.start_state(*initial_empty))
+        self.board = [row[:] for row in self.initial_board]
         self.moves = []
+        self.max_dead_states = 2_000_000
+        self.eviction = "lru"
+        self.dead_states = None
+        self.pruning = True
+        self.memory_limit = None
+        self.pruner = None
+        self.database = None
+        self.observer = None
+        self.solutions = None
+        self.history = None
 
     def get_initial_empty_position(self):
         """Prompts the user to input the initial empty position and validates it."""
         while True:
             try:
-                x, y = map(int, input("Enter the coordinates of the empty cell (x, y) between 0 and 6: ").split(","))
-                if (
-                    0 <= x < 7
-                    and 0 <= y < 7
-                    and self.board[x][y] == 1
-                ):
+                x, y = map(int, input(f"Enter the coordinates of the empty cell (x, y) between 0 and {self.geometry.rows - 1}: ").split(","))
+                if (x, y) in self.geometry.index:
                     return x, y
                 else:
                     print("Invalid coordinates. Please enter valid coordinates within the playable area.")
             except ValueError:
                 print("Invalid input. Please enter two integers separated by a comma.")
 
+    def validate_board(self, board):
+        """Returns a copy of board after checking that it matches the geometry."""
+        layout = self.geometry.layout
+        if len(board) != len(layout) or any(len(row) != len(cells) for row, cells in zip(board, layout)):
+            raise ValueError(f"The board must have {self.geometry.rows} x {self.geometry.cols} cells.")
+        for x, row in enumerate(board):
+            for y, cell in enumerate(row):
+                if (cell in (0, 1)) != ((x, y) in self.geometry.index) or cell not in (-1, 0, 1):
+                    raise ValueError(f"Invalid cell ({x}, {y}): {cell}")
+        return [list(row) for row in board]
+
     def display_board(self):
         """Prints the current state of the board."""
         for row in self.board:
@@ -43,16 +83,9 @@ class SolitaireChinois:
 
     def is_valid_move(self, x1, y1, x2, y2):
         """Checks if a move from (x1, y1) to (x2, y2) is valid."""
-        if not (0 <= x1 < 7 and 0 <= y1 < 7 and 0 <= x2 < 7 and 0 <= y2 < 7):
+        if (x1, y1, x2, y2) not in self.geometry.jumps:
             return False
-        if self.board[x1][y1] != 1 or self.board[x2][y2] != 0:
-            return False
-        dx, dy = x2 - x1, y2 - y1
-        if abs(dx) == 2 and dy == 0 and self.board[x1 + dx // 2][y1] == 1:
-            return True
-        if abs(dy) == 2 and dx == 0 and self.board[x1][y1 + dy // 2] == 1:
-            return True
-        return False
+        return self.board[x1][y1] == 1 and self.board[(x1 + x2) // 2][(y1 + y2) // 2] == 1 and self.board[x2][y2] == 0
 
     def make_move(self, x1, y1, x2, y2):
         """Executes a move and removes the jumped marble."""
@@ -76,141 +109,254 @@ class SolitaireChinois:
         return sum(row.count(1) for row in self.board) == 1 and self.board[self.final_target[0]][self.final_target[1]] == 1
 
     def get_possible_moves(self):
-        """Generates all valid moves."""
-        moves = []
-        for x1 in range(7):
-            for y1 in range(7):
-                if self.board[x1][y1] == 1:
-                    for dx, dy in [(-2, 0), (2, 0), (0, -2), (0, 2)]:
-                        x2, y2 = x1 + dx, y1 + dy
-                        if self.is_valid_move(x1, y1, x2, y2):
-                            moves.append((x1, y1, x2, y2))
-        return moves
-
-    def dfs(self, explored_states, solution_moves):
-        """Solves the puzzle using Depth-First Search and stores the solution moves."""
-        if self.is_goal():
-            return True  # Goal reached
-
-        explored_states[0] += 1
-
-        for move in self.get_possible_moves():
-            x1, y1, x2, y2 = move
-            self.make_move(x1, y1, x2, y2) 
-            solution_moves.append(move) 
-            
-            if self.dfs(explored_states, solution_moves): 
-                return True 
-            
-            solution_moves.pop()  
-            self.undo_move(x1, y1, x2, y2) 
+        """Generates the valid moves from the precomputed jump table of the board geometry.
+
+        With a solution store (load_solution_store), the known winning move
+        comes first, then the moves most frequent in past solutions.
+        """
+        past = self.move_history()
+        moves = past.iter_moves if past is not None else self.geometry.iter_moves
+        for _, _, move in moves(self.geometry.encode(self.board)):
+            yield move
+
+    def dfs(self, explored_states, solution_moves, table=None, checkpoint=None, node_limit=None, time_limit=None,
+            split_depth=None, workers=None):
+        """Solves the puzzle using Depth-First Search and stores the solution moves.
+
+        Returns None if node_limit or time_limit stopped the search; the
+        frontier is then saved to checkpoint and the next call with the same
+        checkpoint resumes from it. With split_depth, the tree is split at
+        that depth and the subtrees are searched by workers processes.
+        A loaded solvability database (load_database) answers first when it
+        covers the position.
+        """
+        first = len(solution_moves)
+        if self.database is not None:
+            solved = retrograde.solve_with_database(self.database, self.geometry.encode(self.board), self.goal_state(),
+                                                    explored_states, solution_moves)
+            if solved is not None:
+                if solved:
+                    self.load_solution(solution_moves[first:])
+                return solved
+        if split_depth is not None:
+            self.pruner = None
+            solved = parallel.parallel_dfs(self.geometry, self.geometry.encode(self.board), self.goal_state(), explored_states,
+                                           solution_moves, split_depth, workers, max_entries=self.max_dead_states,
+                                           pruning=self.pruning)
+            if solved:
+                self.load_solution(solution_moves[first:])
+            return solved
+
+        if table is None:
+            table = TranspositionTable(self.geometry, self.goal_state(), self.max_dead_states, self.eviction)
+        self.dead_states = table
+        solved = search.dfs(self.geometry, self.geometry.encode(self.board), self.goal_state(), explored_states, solution_moves,
+                            table, checkpoint, node_limit, time_limit, pruner=self.make_pruner(), observer=self.observer,
+                            history=self.move_history())
+        if solved:
+            self.load_solution(solution_moves[first:])
+        return solved
+
+    def bidirectional_search(self, explored_states, solution_moves, max_states=1_000_000, node_limit=None, time_limit=None):
+        """Solves the puzzle by meeting a DFS from the start with a backward search from the target (max_states bounds the latter)."""
+        first = len(solution_moves)
+        table = TranspositionTable(self.geometry, self.goal_state(), self.max_dead_states, self.eviction)
+        self.dead_states = table
+        solved = search.bidirectional_search(self.geometry, self.geometry.encode(self.board), self.goal_state(), explored_states,
+                                             solution_moves, table, self.make_pruner(), max_states, observer=self.observer,
+                                             node_limit=node_limit, time_limit=time_limit)
+        if solved:
+            self.load_solution(solution_moves[first:])
+        return solved
+
+    def load_solution_store(self, path):
+        """Opens (or creates) a solution store (see history.py), extended with every solution found."""
+        self.solutions = history.SolutionStore(path)
+        self.history = None
+
+    def move_history(self):
+        """History of the current target loaded from the solution store, or None without a store."""
+        if self.solutions is None:
+            return None
+        if self.history is None or self.history.goal != self.goal_state():
+            self.history = self.solutions.load(self.geometry, self.goal_state())
+        return self.history
+
+    def load_database(self, path):
+        """Loads a solvability database built by retrograde.py."""
+        self.database = retrograde.SolvabilityDatabase(path, self.geometry)
+
+    def is_solvable(self):
+        """True/False if the target can still be reached from the current board, None without a database covering it."""
+        if self.database is None:
+            return None
+        return self.database.solvable(self.geometry.encode(self.board), self.goal_state())
+
+    def next_winning_move(self):
+        """A move (x1, y1, x2, y2) keeping the target reachable, according to the database, or None."""
+        if not self.is_solvable():
+            return None
+        return self.database.winning_move(self.geometry.encode(self.board), self.goal_state())[2]
+
+    def solve(self, algorithm="dfs", time_limit=None, node_limit=None, heuristic=None, width=1000, weight=2.0):
+        """Solves from the current board, left unchanged, with algorithm (see batch.ALGORITHMS); returns a search.SolveResult."""
+        explored_states = [0]
+        solution_moves = []
+        stats = {}
+        limits = {"node_limit": node_limit, "time_limit": time_limit}
+        board, moves = [row[:] for row in self.board], self.moves[:]
+        started = time.perf_counter()
+        if algorithm == "dfs":
+            solved = self.dfs(explored_states, solution_moves, **limits)
+        elif algorithm == "bidir":
+            solved = self.bidirectional_search(explored_states, solution_moves, **limits)
+        elif algorithm == "layer":
+            solved = self.layer_search(explored_states, solution_moves, stats=stats, **limits)
+        elif algorithm in self.DEFAULT_HEURISTICS:
+            heuristic = heuristic or self.DEFAULT_HEURISTICS[algorithm]
+            if algorithm == "beam":
+                solved = self.beam_search(explored_states, solution_moves, heuristic, width, stats=stats, **limits)
+            elif algorithm == "layerbeam":
+                solved = self.layer_search(explored_states, solution_moves, heuristic, width, stats=stats, **limits)
+            elif algorithm == "wastar":
+                solved = self.weighted_a_star(explored_states, solution_moves, heuristic, weight, stats=stats,
+                                              **limits)
+            else:
+                method = {"gbfs": self.greedy_best_first_search, "astar": self.a_star_search,
+                          "idastar": self.ida_star_search}[algorithm]
+                solved = method(explored_states, solution_moves, heuristic, **limits)
+        else:
+            raise ValueError(f"Unknown algorithm: {algorithm!r}")
+        elapsed = time.perf_counter() - started
+        self.board, self.moves = board, moves
+        partial = {key: stats[key] for key in search.PARTIAL_KEYS} if "pegs" in stats else None
+        return search.SolveResult(algorithm, heuristic, solved, solution_moves, explored_states[0], elapsed, partial)
+
+    def goal_state(self):
+        """Returns the bitboard of the goal state (a single marble on final_target)."""
+        return self.geometry.bit(*self.final_target)
+
+    def make_pruner(self):
+        """Builds the target's Pruner when pruning is enabled (self.pruning) and keeps it in self.pruner."""
+        self.pruner = Pruner(self.geometry, self.goal_state()) if self.pruning else None
+        return self.pruner
+
+    def report_pruning(self):
+        """Prints the counters of the last Pruner used."""
+        if self.pruner is None:
+            return
+        if self.pruner.rejected:
+            print("The target cannot be reached from this position (position class or pagoda).")
+        else:
+            print(f"Pruning: {self.pruner.pruned} states cut.")
 
-        return False
+    def load_solution(self, solution_moves):
+        """Puts the board and the move history in the state reached by the solution."""
+        if self.solutions is not None:
+            self.solutions.record(self.geometry, self.geometry.encode(self.board), self.goal_state(), solution_moves)
+            self.history = None
+        self.board = self.geometry.decode(self.goal_state())
+        self.moves = [((x1, y1), (x2, y2)) for x1, y1, x2, y2 in solution_moves]
 
     def print_solution_evolution(self, solution_moves):
-        """Reconstructs and prints the board evolution using the solution moves."""
+        """Prints the board evolution, replayed from the current board without modifying it."""
         print("Initial Board:")
         self.display_board()
-
-        # Start from the initial state and apply each move
-        for move in solution_moves:
-            if len(move) != 4:
-                continue  # Skip invalid moves
-            x1, y1, x2, y2 = move
+        for _, x1, y1, x2, y2, state in export.iter_records(self.geometry, self.geometry.encode(self.board), solution_moves):
             print(f"\nMove: {x1, y1} -> {x2, y2}")
-            self.make_move(x1, y1, x2, y2)
-            self.display_board()
+            print(export.render(self.geometry, state))
+            print()
 
 
 
     def heuristic(self):
         """Heuristic: Penalize more for pegs that are not in the center or are far apart."""
-        distance_from_center = sum(abs(x - 3) + abs(y - 3) for y, row in enumerate(self.board) for x, val in enumerate(row) if val == 1)
+        distance_from_center = sum(abs(x - self.geometry.cols // 2) + abs(y - self.geometry.rows // 2) for y, row in enumerate(self.board) for x, val in enumerate(row) if val == 1)
         return sum(row.count(1) for row in self.board) + distance_from_center
     def heuristic_A_star(self):
         """Heuristic: Penalize more for pegs that are not in the center or are far apart."""
-        distance_from_center = sum(abs(x - 3) + abs(y - 3) for y, row in enumerate(self.board) for x, val in enumerate(row) if val == 1)
+        distance_from_center = sum(abs(x - self.geometry.cols // 2) + abs(y - self.geometry.rows // 2) for y, row in enumerate(self.board) for x, val in enumerate(row) if val == 1)
         return sum(row.count(1) for row in self.board) + distance_from_center
 
-    def greedy_best_first_search(self, explored_states, solution_moves):
+    def get_heuristic(self, name):
+        """Builds the heuristic registered under name (see heuristics.HEURISTICS)."""
+        return get_heuristic(name, self.geometry, self.final_target)
+
+    def greedy_best_first_search(self, explored_states, solution_moves, heuristic="center", node_limit=None, time_limit=None):
         """Solves the puzzle using Greedy Best-First Search and stores the solution moves."""
-        pq = []
-        visited = set()
-        initial_state = ([row[:] for row in self.board], [])
-        heappush(pq, (self.heuristic(), initial_state))  # (heuristic, (board, moves))
-        
-        while pq:
-            _, (current_board, current_moves) = heappop(pq)
-            self.board = [row[:] for row in current_board]
-            self.moves = current_moves[:]
-            
-            if self.is_goal():
-                solution_moves.extend(current_moves)  # Store the solution moves
-                return True
-            
-            explored_states[0] += 1
-            board_tuple = tuple(tuple(row) for row in self.board)
-            if board_tuple in visited:
-                continue
-            
-            visited.add(board_tuple)
-            
-            for move in self.get_possible_moves():
-                x1, y1, x2, y2 = move
-                self.make_move(x1, y1, x2, y2)
-                new_state = ([row[:] for row in self.board], self.moves[:] + [move])
-                heappush(pq, (self.heuristic(), new_state))
-                self.undo_move(x1, y1, x2, y2)
-        
-        return False
+        first = len(solution_moves)
+        state = self.geometry.encode(self.board)
+        solved = search.greedy_best_first_search(self.geometry, state, self.goal_state(), self.get_heuristic(heuristic), explored_states, solution_moves,
+                                                 self.make_pruner(), observer=self.observer,
+                                                 node_limit=node_limit, time_limit=time_limit, memory_limit=self.memory_limit)
+        if solved:
+            self.load_solution(solution_moves[first:])
+        return solved
 
 
-    def a_star_search(self, explored_states, solution_moves):
+    def a_star_search(self, explored_states, solution_moves, heuristic="center", node_limit=None, time_limit=None):
         """Solves the puzzle using A* Search and stores the solution moves."""
-        pq = []
-        visited = set()
-        initial_state = ([row[:] for row in self.board], [], 0)  # (board, moves, cost)
-        heappush(pq, (self.heuristic_A_star() + 0, initial_state))  # (f(n) = g(n) + h(n), (board, moves, g(n)))
-        
-        while pq:
-            _, (current_board, current_moves, cost) = heappop(pq)
-            self.board = [row[:] for row in current_board]
-            self.moves = current_moves[:]
-            
-            if self.is_goal():
-                solution_moves.extend(current_moves)  # Store the solution moves
-                return True
-            
-            explored_states[0] += 1
-            board_tuple = tuple(tuple(row) for row in self.board)
-            if board_tuple in visited:
-                continue
-            
-            visited.add(board_tuple)
-            
-            for move in self.get_possible_moves():
-                x1, y1, x2, y2 = move
-                self.make_move(x1, y1, x2, y2)
-                new_cost = cost + 1  # Increment cost for each move
-                new_state = ([row[:] for row in self.board], self.moves[:] + [move], new_cost)
-                heappush(pq, (new_cost + self.heuristic_A_star(), new_state))
-                self.undo_move(x1, y1, x2, y2)
-        
-        return False
+        first = len(solution_moves)
+        state = self.geometry.encode(self.board)
+        solved = search.a_star_search(self.geometry, state, self.goal_state(), self.get_heuristic(heuristic), explored_states, solution_moves,
+                                      self.make_pruner(), observer=self.observer,
+                                      node_limit=node_limit, time_limit=time_limit, memory_limit=self.memory_limit)
+        if solved:
+            self.load_solution(solution_moves[first:])
+        return solved
 
     
+    def beam_search(self, explored_states, solution_moves, heuristic="center", width=1000, node_limit=None, time_limit=None,
+                    stats=None):
+        """Beam search keeping width states per layer; without reaching the target, solution_moves gets the best partial answer."""
+        first = len(solution_moves)
+        state = self.geometry.encode(self.board)
+        solved = search.beam_search(self.geometry, state, self.goal_state(), self.get_heuristic(heuristic), explored_states, solution_moves,
+                                    width, self.make_pruner(), stats, observer=self.observer,
+                                    node_limit=node_limit, time_limit=time_limit)
+        if solved:
+            self.load_solution(solution_moves[first:])
+        return solved
+
+    def layer_search(self, explored_states, solution_moves, heuristic="center", width=None, node_limit=None, time_limit=None,
+                     stats=None):
+        """Vectorized layer-by-layer search (NumPy): breadth-first without width, otherwise a beam of width states ranked by heuristic."""
+        first = len(solution_moves)
+        state = self.geometry.encode(self.board)
+        heuristic = self.get_heuristic(heuristic) if width is not None else None
+        solved = vectorized.layer_search(self.geometry, state, self.goal_state(), explored_states, solution_moves, width,
+                                         heuristic, self.make_pruner(), stats, observer=self.observer,
+                                         node_limit=node_limit, time_limit=time_limit)
+        if solved:
+            self.load_solution(solution_moves[first:])
+        return solved
+
+    def weighted_a_star(self, explored_states, solution_moves, heuristic="center", weight=2.0, node_limit=None,
+                        time_limit=None, stats=None):
+        """Weighted A* that returns the best partial answer found when a budget stops it (see search.report_partial)."""
+        first = len(solution_moves)
+        state = self.geometry.encode(self.board)
+        solved = search.weighted_a_star(self.geometry, state, self.goal_state(), self.get_heuristic(heuristic), explored_states,
+                                        solution_moves, weight, self.make_pruner(), stats, observer=self.observer,
+                                        node_limit=node_limit, time_limit=time_limit, memory_limit=self.memory_limit)
+        if solved:
+            self.load_solution(solution_moves[first:])
+        return solved
+
+    def ida_star_search(self, explored_states, solution_moves, heuristic="pagoda", node_limit=None, time_limit=None):
+        """Solves the puzzle using IDA* (memory linear in the depth) and stores the solution moves."""
+        first = len(solution_moves)
+        state = self.geometry.encode(self.board)
+        solved = search.ida_star_search(self.geometry, state, self.goal_state(), self.get_heuristic(heuristic), explored_states, solution_moves,
+                                        self.make_pruner(), observer=self.observer,
+                                        node_limit=node_limit, time_limit=time_limit)
+        if solved:
+            self.load_solution(solution_moves[first:])
+        return solved
+
     def reset_board(self):
         """Resets the board to the initial configuration."""
-        self.board = [
-            [-1, -1, 1, 1, 1, -1, -1],
-            [-1, -1, 1, 1, 1, -1, -1],
-            [1, 1, 1, 1, 1, 1, 1],
-            [1, 1, 1, 1, 1, 1, 1],
-            [1, 1, 1, 1, 1, 1, 1],
-            [-1, -1, 1, 1, 1, -1, -1],
-            [-1, -1, 1, 1, 1, -1, -1],
-        ]
-        self.board[self.initial_empty[0]][self.initial_empty[1]] = 0
+        self.board = [row[:] for row in self.initial_board]
         self.moves = []
 
 
@@ -228,10 +374,13 @@ class SolitaireChinois:
 
         if solved_dfs:
             print(f"DFS solved the puzzle in {dfs_time:.4f} seconds with {explored_states_dfs[0]} explored states.")
+            self.report_pruning()
+            print(f"Dead-state table: {self.dead_states.hits} hits, {self.dead_states.misses} misses.")
             self.reset_board()  # Reset again to replay the solution
             self.print_solution_evolution(solution_moves_dfs)
         else:
             print("DFS failed to solve the puzzle.")
+            self.report_pruning()
             
         print("\nSolving with GBFS...")
         self.reset_board()  # Reset board for GBFS
@@ -243,10 +392,12 @@ class SolitaireChinois:
 
         if solved_gbfs:
             print(f"GBFS solved the puzzle in {gbfs_time:.4f} seconds with {explored_states_gbfs[0]} explored states.")
+            self.report_pruning()
             self.reset_board()  # Reset again to replay the solution
             self.print_solution_evolution(solution_moves_gbfs)
         else:
             print("GBFS failed to solve the puzzle.")
+            self.report_pruning()
 
         print("\nSolving with A*...")
         self.reset_board()  # Reset board for A*
@@ -258,10 +409,12 @@ class SolitaireChinois:
 
         if solved_a_star:
             print(f"A* solved the puzzle in {a_star_time:.4f} seconds with {explored_states_a_star[0]} explored states.")
+            self.report_pruning()
             self.reset_board()  # Reset again to replay the solution
             self.print_solution_evolution(solution_moves_a_star)
         else:
             print("A* failed to solve the puzzle.")
+            self.report_pruning()
 
 
 
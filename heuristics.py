@@ -0,0 +1,71 @@
+"""Registre des heuristiques des recherches best-first et d'IDA*.
+
+Toutes les heuristiques sont linéaires (offset + somme de poids des trous
+occupés), ce qui permet aux recherches de les mettre à jour par saut. Une
+heuristique peut en plus fournir un Pruner (voir pruning.py) : les états
+qu'il déclare sans issue ne sont jamais développés.
+
+Comme chaque saut retire exactement une bille, toute solution depuis un
+état à n billes compte n - 1 coups : "pegs" est donc exacte sur les états
+résolubles, et c'est l'élagage des pagodes qui distingue "pagoda".
+"""
+
+from pruning import Pruner
+
+
+class Heuristic:
+    """Heuristique linéaire, éventuellement doublée d'un Pruner."""
+
+    def __init__(self, name, geometry, weights, offset=0, pruner=None, admissible=False):
+        self.name = name
+        self.geometry = geometry
+        self.weights = weights
+        self.offset = offset
+        self.pruner = pruner
+        self.admissible = admissible
+
+    def value(self, state):
+        """Valeur de l'heuristique sur state (sans l'élagage)."""
+        return self.offset + self.geometry.weigh(state, self.weights)
+
+
+def distance_weights(geometry, x, y):
+    """Poids par trou : 1 (la bille) plus sa distance de Manhattan à (x, y)."""
+    return [1 + abs(cx - x) + abs(cy - y) for cx, cy in geometry.cells]
+
+
+def distance(geometry, target):
+    """Billes restantes plus leurs distances de Manhattan à la cible (non admissible)."""
+    return Heuristic("distance", geometry, distance_weights(geometry, *target))
+
+
+def center(geometry, target):
+    """Billes restantes plus leurs distances de Manhattan au centre (non admissible)."""
+    return Heuristic("center", geometry, distance_weights(geometry, geometry.rows // 2, geometry.cols // 2))
+
+
+def pegs(geometry, target):
+    """Nombre de coups restants, billes restantes moins une (admissible)."""
+    return Heuristic("pegs", geometry, [1] * geometry.size, -1, admissible=True)
+
+
+def pagoda(geometry, target):
+    """Comme pegs, avec élagage par classes de position et pagodes (admissible)."""
+    return Heuristic("pagoda", geometry, [1] * geometry.size, -1, Pruner(geometry, geometry.bit(*target)), admissible=True)
+
+
+HEURISTICS = {
+    "distance": distance,
+    "center": center,
+    "pegs": pegs,
+    "pagoda": pagoda,
+}
+
+
+def get_heuristic(name, geometry, target):
+    """Construit l'heuristique name pour cette géométrie et cette cible."""
+    try:
+        builder = HEURISTICS[name]
+    except KeyError:
+        raise ValueError(f"Heuristique inconnue : {name!r} (disponibles : {', '.join(HEURISTICS)})") from None
+    return builder(geometry, target)
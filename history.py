@@ -0,0 +1,116 @@
+"""Base persistante des solutions et historique des sauts gagnants.
+
+SolutionStore est une base SQLite qui garde, par géométrie et par cible :
+
+- les positions gagnantes : chaque état d'une solution trouvée, avec le
+  saut qui le rapproche de la cible ; la solution est aussi enregistrée
+  pour chacune de ses images par les symétries du plateau (image de
+  l'état de départ vers image de la cible) ;
+- les compteurs d'historique : le nombre de solutions où figure chaque saut.
+
+load() en tire un MoveHistory pour une recherche : la DFS (voir
+search.dfs) essaie les sauts dans l'ordre de leurs compteurs et s'arrête
+dès qu'elle atteint une position gagnante connue, dont la suite est
+relue dans winning. Une instance déjà résolue, ou qui rejoint une
+solution passée, est donc résolue sans nouvelle recherche.
+
+Les sauts d'une position gagnante mènent tous à une autre position
+gagnante (ou à la cible) : winning a la forme de la frontière arrière de
+search.bidirectional_search et backward_path() sait la suivre.
+"""
+
+import json
+import sqlite3
+
+from bitboard import GEOMETRIES
+
+
+def geometry_key(geometry):
+    """Nom de la géométrie dans GEOMETRIES, ou sa disposition en JSON."""
+    for name, known in GEOMETRIES.items():
+        if known is geometry:
+            return name
+    return json.dumps(geometry.layout)
+
+
+class MoveHistory:
+    """Positions gagnantes (état -> indice du saut) et ordre des sauts pour une géométrie et une cible."""
+
+    def __init__(self, geometry, goal, winning=None, counts=None):
+        self.geometry = geometry
+        self.goal = goal
+        self.winning = winning if winning is not None else {}
+        self.counts = counts if counts is not None else [0] * len(geometry.moves)
+        # Tri stable : à compteurs égaux, l'ordre de la géométrie (celui de la DFS sans historique).
+        self.order = sorted(range(len(geometry.moves)), key=lambda jump: -self.counts[jump])
+
+    def iter_moves(self, state):
+        """Sauts (masque, prérequis, coup) jouables depuis state : le saut gagnant connu d'abord, puis par compteur."""
+        moves = self.geometry.moves
+        winning = self.winning.get(state)
+        if winning is not None:
+            yield moves[winning]
+        for jump in self.order:
+            entry = moves[jump]
+            if jump != winning and state & entry[0] == entry[1]:
+                yield entry
+
+
+class SolutionStore:
+    """Base SQLite des positions gagnantes et des compteurs d'historique."""
+
+    def __init__(self, path="solutions.sqlite"):
+        self.db = sqlite3.connect(path)
+        self.db.execute("CREATE TABLE IF NOT EXISTS winning (geometry TEXT, goal TEXT, state TEXT, jump INTEGER, "
+                        "PRIMARY KEY (geometry, goal, state))")
+        self.db.execute("CREATE TABLE IF NOT EXISTS history (geometry TEXT, goal TEXT, jump INTEGER, count INTEGER, "
+                        "PRIMARY KEY (geometry, goal, jump))")
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    def load(self, geometry, goal):
+        """MoveHistory de geometry et goal, vide si la base ne connaît encore aucune solution."""
+        key = (geometry_key(geometry), str(goal))
+        winning = {int(state): jump for state, jump in
+                   self.db.execute("SELECT state, jump FROM winning WHERE geometry = ? AND goal = ?", key)}
+        counts = [0] * len(geometry.moves)
+        for jump, count in self.db.execute("SELECT jump, count FROM history WHERE geometry = ? AND goal = ?", key):
+            counts[jump] = count
+        return MoveHistory(geometry, goal, winning, counts)
+
+    def record(self, geometry, state, goal, moves):
+        """Ajoute la solution moves (coups (x1, y1, x2, y2) joués depuis state) et ses images par les symétries du plateau."""
+        name = geometry_key(geometry)
+        jumps = {move: jump for jump, (_, _, move) in enumerate(geometry.moves)}
+        path = [jumps[tuple(move)] for move in moves]
+        winning = []
+        counts = {}
+        for image, jump_images in _symmetries(geometry, jumps):
+            target = str(image(goal))
+            current = state
+            for jump in path:
+                winning.append((name, target, str(image(current)), jump_images[jump]))
+                counts[target, jump_images[jump]] = counts.get((target, jump_images[jump]), 0) + 1
+                current ^= geometry.moves[jump][0]
+        self.db.executemany("INSERT OR IGNORE INTO winning VALUES (?, ?, ?, ?)", winning)
+        self.db.executemany("INSERT INTO history VALUES (?, ?, ?, ?) "
+                            "ON CONFLICT (geometry, goal, jump) DO UPDATE SET count = count + excluded.count",
+                            [(name, target, jump, count) for (target, jump), count in counts.items()])
+        self.db.commit()
+
+
+def _symmetries(geometry, jumps):
+    """(image d'un état, image de chaque indice de saut) pour l'identité et chaque symétrie du plateau."""
+    identity = list(range(len(geometry.moves)))
+    found = [(lambda state: state, identity)]
+    seen = {tuple(identity)}
+    cells, index = geometry.cells, geometry.index
+    for perm, symmetry in zip(geometry.permutations, geometry.symmetries):
+        jump_images = [jumps[(*cells[perm[index[x1, y1]]], *cells[perm[index[x2, y2]]])]
+                       for _, _, (x1, y1, x2, y2) in geometry.moves]
+        if tuple(jump_images) not in seen:
+            seen.add(tuple(jump_images))
+            found.append((lambda state, symmetry=symmetry: geometry.transform(state, symmetry), jump_images))
+    return found
@@ -0,0 +1,156 @@
+"""Suivi de l'avancement des recherches.
+
+Les recherches de search.py acceptent un observer : tous les every nœuds
+développés, elles lui passent leurs compteurs (nœuds développés, générés,
+doublons, profondeur ou borne f, taille de la frontière), et il n'émet un
+instantané, complété du temps écoulé et de la mémoire, que si interval
+secondes se sont écoulées depuis le précédent. Avec timers=True, les
+opérations de tas, de hachage (tables d'états vus ou morts) et
+d'heuristique (pagodes) sont chronométrées à part ; le reste du temps de
+la boucle est attribué à la génération des coups.
+
+    observer = PrintObserver(interval=5.0)
+    search.dfs(geometry, state, goal, explored_states, solution_moves, observer=observer)
+"""
+
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PHASES = ("heap", "hash", "heuristic")
+
+
+class PhaseTimers:
+    """Temps cumulés par phase, mesurés en enveloppant les fonctions de chaque phase."""
+
+    def __init__(self):
+        self.totals = dict.fromkeys(PHASES, 0.0)
+
+    def wrap(self, phase, function):
+        """Retourne function, chronométrée au compte de phase."""
+        totals = self.totals
+        clock = time.perf_counter
+
+        def timed(*args):
+            started = clock()
+            try:
+                return function(*args)
+            finally:
+                totals[phase] += clock() - started
+
+        return timed
+
+    def reset(self):
+        """Remet les temps à zéro, sans invalider les fonctions déjà enveloppées."""
+        for phase in self.totals:
+            self.totals[phase] = 0.0
+
+    def report(self, elapsed):
+        """Temps par phase, la génération des coups recevant le reste de elapsed."""
+        phases = {phase: round(total, 6) for phase, total in self.totals.items()}
+        phases["moves"] = round(max(elapsed - sum(self.totals.values()), 0.0), 6)
+        return phases
+
+
+def memory_usage():
+    """Mémoire en octets : pic tracemalloc s'il trace, sinon pic de mémoire résidente, sinon None."""
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[1]
+    if resource is not None:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return None
+
+
+class Observer:
+    """Observateur d'une recherche ; les sous-classes redéfinissent progress() et finish()."""
+
+    def __init__(self, interval=1.0, every=4096, timers=False):
+        self.interval = interval
+        self.every = every
+        self.timers = PhaseTimers() if timers else None
+        self.algorithm = None
+        self.started = None
+        self.last = None
+
+    def wrap(self, phase, function):
+        """function, chronométrée si les timers sont actifs (None reste None)."""
+        if self.timers is None or function is None:
+            return function
+        return self.timers.wrap(phase, function)
+
+    def start(self, algorithm):
+        """Appelé par la recherche avant son premier nœud."""
+        self.algorithm = algorithm
+        self.started = self.last = time.perf_counter()
+        if self.timers is not None:
+            self.timers.reset()
+
+    def update(self, **counters):
+        """Appelé tous les every nœuds ; émet un instantané toutes les interval secondes."""
+        now = time.perf_counter()
+        if now - self.last >= self.interval:
+            self.last = now
+            self.progress(self.snapshot(counters, now))
+
+    def done(self, solved, **counters):
+        """Appelé par la recherche quand elle se termine ou s'interrompt."""
+        snapshot = self.snapshot(counters, time.perf_counter())
+        snapshot["solved"] = solved
+        self.finish(snapshot)
+
+    def snapshot(self, counters, now):
+        """Compteurs de la recherche, complétés du temps écoulé, de la mémoire et des phases."""
+        snapshot = {"algorithm": self.algorithm, **counters}
+        snapshot["elapsed"] = round(now - self.started, 6)
+        snapshot["memory"] = memory_usage()
+        if self.timers is not None:
+            snapshot["phases"] = self.timers.report(now - self.started)
+        return snapshot
+
+    def progress(self, snapshot):
+        """Instantané intermédiaire."""
+
+    def finish(self, snapshot):
+        """Instantané final (avec la clé solved)."""
+
+
+class PrintObserver(Observer):
+    """Affiche une ligne par instantané."""
+
+    def progress(self, snapshot):
+        print(format_snapshot(snapshot))
+
+    def finish(self, snapshot):
+        print(format_snapshot(snapshot) + f" -> {snapshot['solved']}")
+
+
+class RecordingObserver(Observer):
+    """Garde tous les instantanés dans self.snapshots (le dernier est le final)."""
+
+    def __init__(self, interval=1.0, every=4096, timers=False):
+        super().__init__(interval, every, timers)
+        self.snapshots = []
+
+    def progress(self, snapshot):
+        self.snapshots.append(snapshot)
+
+    def finish(self, snapshot):
+        self.snapshots.append(snapshot)
+
+
+def format_snapshot(snapshot):
+    """Ligne lisible d'un instantané."""
+    line = (f"[{snapshot['algorithm']} {snapshot['elapsed']:8.1f} s] {snapshot['expanded']} développés, "
+            f"{snapshot['generated']} générés, {snapshot['duplicates']} doublons, "
+            f"profondeur {snapshot['depth']}, frontière {snapshot['frontier']}")
+    if "bound" in snapshot:
+        line += f", borne f {snapshot['bound']}"
+    if snapshot["memory"] is not None:
+        line += f", {snapshot['memory'] / 2**20:.1f} Mio"
+    if "phases" in snapshot:
+        line += " (" + ", ".join(f"{phase} {total:.2f} s" for phase, total in snapshot["phases"].items()) + ")"
+    return line
@@ -1 +0,0 @@
-python solitaire_chinois.py
@@ -0,0 +1,74 @@
+"""Fonctions pagodes du solitaire chinois.
+
+Une fonction pagode associe une valeur p à chaque trou de sorte que, pour
+tout saut (départ, sautée, arrivée), p(arrivée) <= p(départ) + p(sautée).
+La somme des valeurs des trous occupés ne peut donc que baisser au fil des
+coups : un état dont la somme est inférieure à celle de l'état cible ne
+peut plus l'atteindre.
+"""
+
+from collections import deque
+
+
+class Pagoda:
+    """Fonction pagode d'une géométrie, évaluée par tables d'octets."""
+
+    def __init__(self, geometry, weights, name="pagoda"):
+        if not is_pagoda(geometry, weights):
+            raise ValueError(f"{name} n'est pas une fonction pagode pour ce plateau.")
+        self.geometry = geometry
+        self.weights = weights
+        self.name = name
+        self.tables = geometry.byte_tables(weights)
+
+    def value(self, state):
+        """Somme des valeurs des trous occupés de state."""
+        return self.geometry.lookup(state, self.tables)
+
+
+def is_pagoda(geometry, weights):
+    """Vérifie l'inégalité des pagodes sur tous les sauts de la géométrie."""
+    index = geometry.index
+    for _, _, (x1, y1, x2, y2) in geometry.moves:
+        over = index[(x1 + x2) // 2, (y1 + y2) // 2]
+        if weights[index[x2, y2]] > weights[index[x1, y1]] + weights[over]:
+            return False
+    return True
+
+
+def jump_distances(geometry, x, y):
+    """Distance de chaque trou à (x, y), en pas le long des lignes de saut."""
+    index = geometry.index
+    neighbours = [set() for _ in geometry.cells]
+    for _, _, (x1, y1, x2, y2) in geometry.moves:
+        over = index[(x1 + x2) // 2, (y1 + y2) // 2]
+        for a, b in ((index[x1, y1], over), (over, index[x2, y2])):
+            neighbours[a].add(b)
+            neighbours[b].add(a)
+
+    distances = [None] * geometry.size
+    distances[index[x, y]] = 0
+    queue = deque([index[x, y]])
+    while queue:
+        cell = queue.popleft()
+        for other in neighbours[cell]:
+            if distances[other] is None:
+                distances[other] = distances[cell] + 1
+                queue.append(other)
+    return distances
+
+
+def golden_pagoda(geometry, x, y):
+    """Pagode de Conway centrée sur (x, y), en entiers de Fibonacci.
+
+    Un trou à distance d de la cible vaut F(n - d) : F(k) = F(k-1) + F(k-2)
+    garantit l'inégalité des pagodes le long de chaque ligne de saut. Les
+    trous inaccessibles depuis la cible valent 0.
+    """
+    distances = jump_distances(geometry, x, y)
+    top = max(d for d in distances if d is not None) + 3
+    fibonacci = [0, 1]
+    while len(fibonacci) <= top:
+        fibonacci.append(fibonacci[-1] + fibonacci[-2])
+    weights = [fibonacci[top - d] if d is not None else 0 for d in distances]
+    return Pagoda(geometry, weights, f"golden({x}, {y})")
@@ -0,0 +1,94 @@
+"""DFS parallèle d'une seule instance, découpée à la racine.
+
+L'arbre de recherche est développé en largeur jusqu'à la profondeur
+split_depth ; chaque nœud obtenu devient la racine d'une DFS confiée à un
+processus. Le premier processus qui atteint la cible lève un événement qui
+arrête les autres, et tous publient leurs états morts dans un cache partagé
+borné (voir SharedTranspositionTable).
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import search
+from pruning import Pruner
+from transposition import SharedTranspositionTable, TranspositionTable
+
+_worker = {}
+
+
+def split(geometry, state, goal, depth, explored_states):
+    """Développe l'arbre jusqu'à depth et retourne les racines (état, préfixe de coups).
+
+    Les nœuds symétriques (pour la cible) ne sont gardés qu'une fois. Si la
+    cible est atteinte avant depth, retourne [(goal, préfixe)].
+    """
+    table = TranspositionTable(geometry, goal)
+    layer = [(state, [])]
+    for _ in range(depth):
+        seen = set()
+        next_layer = []
+        for parent, prefix in layer:
+            explored_states[0] += 1
+            for mask, pre, move in geometry.moves:
+                if parent & mask == pre:
+                    child = parent ^ mask
+                    if child == goal:
+                        return [(child, prefix + [move])]
+                    key = table.key(child)
+                    if key not in seen:
+                        seen.add(key)
+                        next_layer.append((child, prefix + [move]))
+        layer = next_layer
+    return layer
+
+
+def _init_worker(geometry, goal, cancel, shared, max_entries, pruning):
+    _worker["geometry"] = geometry
+    _worker["goal"] = goal
+    _worker["cancel"] = cancel
+    _worker["table"] = SharedTranspositionTable(geometry, goal, shared, max_entries)
+    _worker["pruner"] = Pruner(geometry, goal) if pruning else None
+
+
+def _solve_subtree(state):
+    """DFS d'un sous-arbre dans un processus ; retourne (résolu, coups, états explorés)."""
+    if _worker["cancel"].is_set():
+        return None, [], 0
+    explored_states = [0]
+    solution_moves = []
+    solved = search.dfs(_worker["geometry"], state, _worker["goal"], explored_states, solution_moves,
+                        _worker["table"], cancel=_worker["cancel"], pruner=_worker["pruner"])
+    return solved, solution_moves, explored_states[0]
+
+
+def parallel_dfs(geometry, state, goal, explored_states, solution_moves, split_depth=3, workers=None,
+                 shared_slots=1 << 22, max_entries=2_000_000, pruning=True):
+    """Résout une instance avec une DFS répartie sur workers processus."""
+    if state == goal:
+        return True
+    if geometry.size >= 64:
+        raise ValueError("Le cache partagé des états morts ne gère que les plateaux de moins de 64 trous.")
+    if pruning and not Pruner(geometry, goal).solvable(state):
+        return False
+
+    roots = split(geometry, state, goal, split_depth, explored_states)
+    if len(roots) == 1 and roots[0][0] == goal:
+        solution_moves.extend(roots[0][1])
+        return True
+
+    cancel = multiprocessing.Event()
+    shared = multiprocessing.Array("Q", shared_slots, lock=False)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(geometry, goal, cancel, shared, max_entries, pruning)) as pool:
+        futures = {pool.submit(_solve_subtree, root): prefix for root, prefix in roots}
+        for future in as_completed(futures):
+            solved, moves, explored = future.result()
+            explored_states[0] += explored
+            if solved:
+                cancel.set()
+                for pending in futures:
+                    pending.cancel()
+                solution_moves.extend(futures[future] + moves)
+                return True
+    return False
@@ -0,0 +1,236 @@
+"""Élagage des états qui ne peuvent plus atteindre la cible finale.
+
+Deux familles d'invariants, vérifiées en O(1) sur le bitboard :
+
+- les classes de position : un saut change l'état de trois trous, donc la
+  parité du nombre de billes dans tout ensemble de trous qui coupe chaque
+  saut en 0 ou 2 trous ne change jamais. Ces ensembles forment le noyau
+  (sur GF(2)) de la matrice d'incidence des sauts ; sur le plateau anglais
+  il est de dimension 4, soit les 16 classes classiques. Un état d'une autre
+  classe que la cible est rejeté d'emblée, sans recherche ;
+- les fonctions pagodes (voir pagoda.py) : la pagode de Conway centrée sur
+  la cible, plus, pour le plateau anglais, une bibliothèque de pagodes
+  précalculées par tune_pagoda.
+"""
+
+import random
+
+from bitboard import ENGLISH_LAYOUT
+from pagoda import Pagoda, golden_pagoda, is_pagoda
+
+# Pagodes du plateau anglais, une par classe de trous équivalents par
+# symétrie, indexées par la cible pour laquelle tune_pagoda les a réglées.
+# Elles sont ramenées sur les autres cibles de la classe par symétrie ; les
+# cases hors plateau valent 0 et sont ignorées.
+ENGLISH_PAGODAS = {
+    (3, 3): (
+        (  0,   0,  -2,   1,  -1,   0,   0),
+        (  0,   0,   4,   7,   2,   0,   0),
+        ( -1,   3,   2,   5,   1,   4,  -1),
+        (  1,   6,   6,  12,   2,  10,   0),
+        (  0,   1,   1,   1,   1,   2,  -1),
+        (  0,   0,   5,  11,   3,   0,   0),
+        (  0,   0,  -3,   1,  -2,   0,   0),
+    ),
+    (2, 3): (
+        (  0,   0,  -3,   1,  -4,   0,   0),
+        (  0,   0,   7,  19,  11,   0,   0),
+        ( -6,  16,   4,  20,   7,  13,  -1),
+        (  0,   9,   3,  12,   4,   9,   1),
+        ( -6,   8,   1,   8,   4,   4,   0),
+        (  0,   0,   2,   8,   4,   0,   0),
+        (  0,   0,   0,   0,   0,   0,   0),
+    ),
+    (1, 3): (
+        (  0,   0,  -7,  10,   2,   0,   0),
+        (  0,   0,  17,  35,   6,   0,   0),
+        (  0,  10,  10,  20,   8,  12,   2),
+        (  0,   8,   7,  15,   5,  10,   0),
+        (  0,   3,   3,   5,   3,   2,   2),
+        (  0,   0,   4,  10,   3,   0,   0),
+        (  0,   0,   0,   0,   0,   0,   0),
+    ),
+    (0, 3): (
+        (  0,   0,   2,  55,   5,   0,   0),
+        (  0,   0,   8,  34,   6,   0,   0),
+        (  0,  11,  10,  21,  11,  10,   1),
+        (  0,   7,   6,  13,   7,   6,   1),
+        (  0,   4,   4,   8,   4,   4,   0),
+        (  0,   0,   3,   9,   3,   0,   0),
+        (  0,   0,   1,   0,   1,   0,   0),
+    ),
+    (2, 2): (
+        (  0,   0,   4,  11,  -6,   0,   0),
+        (  0,   0,  27,  12,  15,   0,   0),
+        ( -4,  35,  31,  22,   9,  16,  -7),
+        (  1,  21,  22,  14,   8,   7,   1),
+        ( -5,  15,   9,   8,   2,   9,  -7),
+        (  0,   0,  14,   9,   7,   0,   0),
+        (  0,   0,  -5,   0,  -5,   0,   0),
+    ),
+    (1, 2): (
+        (  0,   0, -19,  11,  -8,   0,   0),
+        (  0,   0,  55,  36,  19,   0,   0),
+        ( 10,  22,  32,  21,  11,  13,  -2),
+        (  9,  14,  23,  15,   8,   7,   1),
+        (  1,   8,   9,   6,   3,   6,  -3),
+        (  0,   0,  14,   9,   5,   0,   0),
+        (  0,   0,  -2,   0,  -2,   0,   0),
+    ),
+    (0, 2): (
+        (  0,   0,  79,  58,  21,   0,   0),
+        (  0,   0,  51,  37,  14,   0,   0),
+        ( -6,  34,  28,  21,   7,  14,  -6),
+        (  0,  23,  23,  16,   8,   8,   1),
+        ( -6,  12,   6,   6,   0,   6,  -6),
+        (  0,   0,  18,  11,   8,   0,   0),
+        (  0,   0,  -9,   4,  -8,   0,   0),
+    ),
+}
+
+
+def parity_masks(geometry):
+    """Base des ensembles de trous coupant chaque saut en un nombre pair de trous."""
+    pivots = {}
+    for mask, _, _ in geometry.moves:
+        row = mask
+        for bit, pivot in pivots.items():
+            if row >> bit & 1:
+                row ^= pivot
+        if row:
+            bit = row.bit_length() - 1
+            for other in pivots:
+                if pivots[other] >> bit & 1:
+                    pivots[other] ^= row
+            pivots[bit] = row
+
+    masks = []
+    for free in range(geometry.size):
+        if free in pivots:
+            continue
+        mask = 1 << free
+        for bit, pivot in pivots.items():
+            if pivot >> free & 1:
+                mask |= 1 << bit
+        masks.append(mask)
+    return masks
+
+
+def peg_lower_bound(geometry, state):
+    """Moins grand nombre de billes d'un état de la classe de position de state.
+
+    Aucun état atteignable depuis state n'a moins de billes : la borne est
+    prouvée, mais par les seules classes de position. Elle vaut 1 dès qu'un
+    trou isolé est de la classe de state, ce qui est le cas de tout état
+    accepté par Pruner.solvable() pour une cible à une bille.
+    """
+    masks = parity_masks(geometry)
+
+    def signature(bits):
+        return sum(((bits & mask).bit_count() & 1) << i for i, mask in enumerate(masks))
+
+    cells = {signature(1 << i) for i in range(geometry.size)}
+    target = signature(state)
+    reached, pegs = cells, 1
+    while target not in reached and pegs < state.bit_count():
+        reached = {known ^ cell for known in reached for cell in cells}
+        pegs += 1
+    return pegs
+
+
+def pagoda_library(geometry, target):
+    """Pagodes utiles pour la cible target : Conway, puis la bibliothèque anglaise."""
+    pagodas = [golden_pagoda(geometry, *target)]
+    if geometry.layout != [list(row) for row in ENGLISH_LAYOUT]:
+        return pagodas
+
+    index = geometry.index
+    seen = set()
+    for source, rows in ENGLISH_PAGODAS.items():
+        weights = [rows[x][y] for x, y in geometry.cells]
+        for perm in geometry.permutations:
+            if perm[index[source]] != index[target]:
+                continue
+            image = [0] * geometry.size
+            for i, weight in enumerate(weights):
+                image[perm[i]] = weight
+            if tuple(image) not in seen:
+                seen.add(tuple(image))
+                pagodas.append(Pagoda(geometry, image, f"english{source}"))
+    return pagodas
+
+
+class Pruner:
+    """Classes de position et pagodes d'une cible, avec compteurs d'élagage."""
+
+    def __init__(self, geometry, goal, parity=True, pagodas=True):
+        self.geometry = geometry
+        self.goal = goal
+        self.classes = [(mask, (goal & mask).bit_count() & 1) for mask in parity_masks(geometry)] if parity else []
+        self.pagodas = []
+        if pagodas and goal.bit_count() == 1:
+            target = geometry.cells[goal.bit_length() - 1]
+            self.pagodas = [(pagoda, pagoda.value(goal)) for pagoda in pagoda_library(geometry, target)]
+        self.pruned = 0
+        self.rejected = 0
+
+    def solvable(self, state):
+        """Faux si un invariant prouve déjà que state n'atteint pas la cible (à tester sur l'état initial)."""
+        for mask, parity in self.classes:
+            if (state & mask).bit_count() & 1 != parity:
+                self.rejected += 1
+                return False
+        for pagoda, bound in self.pagodas:
+            if pagoda.value(state) < bound:
+                self.rejected += 1
+                return False
+        return True
+
+    def dead(self, state):
+        """Vrai (et compté) si une pagode prouve que state n'atteint plus la cible.
+
+        Les classes de position ne changent pas au fil des coups : il suffit
+        de les tester une fois, avec solvable(), sur l'état initial.
+        """
+        for pagoda, bound in self.pagodas:
+            if pagoda.value(state) < bound:
+                self.pruned += 1
+                return True
+        return False
+
+
+def tune_pagoda(geometry, target, samples=2000, iterations=8000, seed=0):
+    """Règle une pagode pour target par montée aléatoire depuis la pagode de Conway.
+
+    L'objectif est le nombre d'états, tirés de parties aléatoires, que la
+    pagode élimine ; seules les modifications qui respectent l'inégalité des
+    pagodes sont acceptées, donc le résultat est toujours valide. C'est ainsi
+    qu'ENGLISH_PAGODAS a été calculé.
+    """
+    rng = random.Random(seed)
+    population = []
+    while len(population) < samples:
+        state = geometry.start_state(*rng.choice(geometry.cells))
+        while True:
+            moves = geometry.possible_moves(state)
+            if not moves:
+                break
+            state ^= rng.choice(moves)[0]
+            population.append([i for i in range(geometry.size) if state >> i & 1])
+
+    goal = geometry.index[target]
+
+    def score(weights):
+        return sum(1 for pegs in population if sum(weights[i] for i in pegs) < weights[goal])
+
+    weights = golden_pagoda(geometry, *target).weights[:]
+    best = score(weights)
+    for _ in range(iterations):
+        candidate = weights[:]
+        for _ in range(rng.choice((1, 1, 2))):
+            candidate[rng.randrange(geometry.size)] += rng.choice((-2, -1, 1))
+        if is_pagoda(geometry, candidate):
+            value = score(candidate)
+            if value >= best:
+                weights, best = candidate, value
+    return weights
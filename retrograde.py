@@ -0,0 +1,204 @@
+"""Base de solvabilité rétrograde du solitaire chinois.
+
+Le constructeur (hors ligne) énumère, couche par couche, toutes les
+positions atteignables depuis une position vide initiale, puis remonte les
+couches en partant d'une bille : l'ensemble des cibles encore atteignables
+depuis une position est l'union de celles de ses enfants. Les positions ne
+sont stockées qu'une fois par classe de symétrie (symétries qui fixent la
+position vide initiale), avec leur masque de cibles exprimé dans le repère
+du représentant.
+
+Le fichier est un en-tête suivi de deux tableaux uint64 : les
+représentants triés, puis leurs masques de cibles. À la lecture, il est
+projeté en mémoire (mmap) et chaque requête est une recherche
+dichotomique :
+
+    python retrograde.py 3,3 -o centre.db
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import time
+from array import array
+from bisect import bisect_left
+
+from bitboard import ENGLISH, GEOMETRIES
+
+MAGIC = b"SOLDB1\0\0"
+HEADER = struct.Struct("<8sQQQ")  # magique, nombre de trous, trou vide initial, nombre de positions
+
+
+class _Symmetries:
+    """Symétries qui fixent un état, avec leurs inverses, pour canonicaliser avec suivi du repère."""
+
+    def __init__(self, geometry, fixed):
+        self.geometry = geometry
+        self.forward = []
+        self.backward = []
+        for perm, tables in zip(geometry.permutations, geometry.symmetries):
+            if geometry.lookup(fixed, tables) != fixed:
+                continue
+            inverse = [0] * geometry.size
+            for i, j in enumerate(perm):
+                inverse[j] = i
+            self.forward.append(tables)
+            self.backward.append(geometry.byte_tables([1 << i for i in inverse]))
+        if not self.forward:
+            identity = geometry.byte_tables([1 << i for i in range(geometry.size)])
+            self.forward.append(identity)
+            self.backward.append(identity)
+
+    def canonical(self, state):
+        """Retourne (représentant, indice de la symétrie qui y mène)."""
+        lookup = self.geometry.lookup
+        best, best_index = None, 0
+        for i, tables in enumerate(self.forward):
+            image = lookup(state, tables)
+            if best is None or image < best:
+                best, best_index = image, i
+        return best, best_index
+
+    def restore(self, mask, index):
+        """Ramène un masque du repère du représentant dans celui de l'état d'origine."""
+        return self.geometry.lookup(mask, self.backward[index])
+
+
+def build_database(geometry, initial_empty, path, verbose=False):
+    """Construit la base des positions atteignables depuis initial_empty et l'écrit dans path."""
+    if geometry.size > 64:
+        raise ValueError("La base de solvabilité ne gère que les plateaux d'au plus 64 trous.")
+    start = geometry.start_state(*initial_empty)
+    symmetries = _Symmetries(geometry, start)
+    moves = geometry.moves
+    started = time.perf_counter()
+
+    # Énumération avant : layers[n] contient les représentants à n billes.
+    layers = {}
+    pegs = start.bit_count()
+    layer = {symmetries.canonical(start)[0]}
+    while layer:
+        next_layer = set()
+        for state in layer:
+            for mask, pre, _ in moves:
+                if state & mask == pre:
+                    next_layer.add(symmetries.canonical(state ^ mask)[0])
+        layers[pegs] = array("Q", sorted(layer))
+        if verbose:
+            print(f"{pegs} billes : {len(layer)} positions ({time.perf_counter() - started:.1f} s)")
+        layer = next_layer
+        pegs -= 1
+
+    # Passe arrière : cibles atteignables, des positions à une bille vers le départ.
+    targets = {}
+    states_out = array("Q")
+    masks_out = array("Q")
+    for pegs in sorted(layers):
+        current = {}
+        for state in layers[pegs]:
+            if pegs == 1:
+                reachable = state
+            else:
+                reachable = 0
+                for mask, pre, _ in moves:
+                    if state & mask == pre:
+                        child, index = symmetries.canonical(state ^ mask)
+                        child_targets = targets.get(child, 0)
+                        if child_targets:
+                            reachable |= symmetries.restore(child_targets, index)
+            current[state] = reachable
+        targets = current
+        for state in layers[pegs]:
+            states_out.append(state)
+            masks_out.append(current[state])
+        if verbose:
+            print(f"{pegs} billes : cibles calculées ({time.perf_counter() - started:.1f} s)")
+
+    # Les couches sont triées mais se chevauchent : on trie l'ensemble.
+    order = sorted(range(len(states_out)), key=states_out.__getitem__)
+    with open(path + ".tmp", "wb") as file:
+        file.write(HEADER.pack(MAGIC, geometry.size, geometry.index[tuple(initial_empty)], len(order)))
+        array("Q", (states_out[i] for i in order)).tofile(file)
+        array("Q", (masks_out[i] for i in order)).tofile(file)
+    os.replace(path + ".tmp", path)
+    return len(order)
+
+
+class SolvabilityDatabase:
+    """Base écrite par build_database, projetée en mémoire pour des requêtes en microsecondes."""
+
+    def __init__(self, path, geometry=ENGLISH):
+        self.geometry = geometry
+        with open(path, "rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, size, empty, count = HEADER.unpack_from(self.map)
+        if magic != MAGIC or size != geometry.size:
+            self.map.close()
+            raise ValueError(f"{path} n'est pas une base de solvabilité pour ce plateau.")
+        self.initial_empty = geometry.cells[empty]
+        self.count = count
+        view = memoryview(self.map)
+        self.states = view[HEADER.size:HEADER.size + 8 * count].cast("Q")
+        self.masks = view[HEADER.size + 8 * count:HEADER.size + 16 * count].cast("Q")
+        self.symmetries = _Symmetries(geometry, geometry.start_state(*self.initial_empty))
+
+    def close(self):
+        self.states.release()
+        self.masks.release()
+        self.map.close()
+
+    def targets(self, state):
+        """Masque des cibles atteignables depuis state, ou None si state n'est pas dans la base."""
+        canonical, index = self.symmetries.canonical(state)
+        i = bisect_left(self.states, canonical)
+        if i == self.count or self.states[i] != canonical:
+            return None
+        return self.symmetries.restore(self.masks[i], index)
+
+    def solvable(self, state, goal):
+        """True/False selon que state atteint goal, None si state n'est pas dans la base."""
+        targets = self.targets(state)
+        if targets is None:
+            return None
+        return bool(targets & goal)
+
+    def winning_move(self, state, goal):
+        """Un saut (masque, prérequis, coup) de state qui garde goal atteignable, ou None."""
+        for entry in self.geometry.iter_moves(state):
+            if self.solvable(state ^ entry[0], goal):
+                return entry
+        return None
+
+
+def solve_with_database(database, state, goal, explored_states, solution_moves):
+    """Suit les coups gagnants de la base ; None si state n'y figure pas."""
+    solvable = database.solvable(state, goal)
+    if not solvable:
+        return solvable
+    while state != goal:
+        explored_states[0] += 1
+        mask, _, move = database.winning_move(state, goal)
+        solution_moves.append(move)
+        state ^= mask
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Construit la base de solvabilité d'une position vide initiale.")
+    parser.add_argument("initial_empty", help="position vide initiale, au format x,y")
+    parser.add_argument("-g", "--geometry", choices=GEOMETRIES, default="english", help="plateau")
+    parser.add_argument("-o", "--output", help="fichier de sortie (par défaut solvabilite_x_y.db)")
+    args = parser.parse_args(argv)
+
+    geometry = GEOMETRIES[args.geometry]
+    initial_empty = tuple(map(int, args.initial_empty.split(",")))
+    if initial_empty not in geometry.index:
+        parser.error(f"Position hors de la zone jouable : {args.initial_empty}")
+    output = args.output or f"solvabilite_{initial_empty[0]}_{initial_empty[1]}.db"
+    count = build_database(geometry, initial_empty, output, verbose=True)
+    print(f"{count} positions enregistrées dans {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,933 @@
+"""Recherches DFS, GBFS et A* sur les états bitboard.
+
+Ces fonctions sont partagées par les classes SolitaireChinois de final.py et
+de solitaire_chinois.py : elles travaillent sur des entiers (voir bitboard.py)
+et remplissent explored_states et solution_moves comme les anciennes méthodes.
+"""
+
+import json
+import os
+import time
+from array import array
+from fractions import Fraction
+from heapq import heappush, heappop, nsmallest
+
+from external import ExternalMemory
+from heuristics import distance_weights
+from pruning import Pruner, peg_lower_bound
+
+
+class SolveResult:
+    """Résultat d'une résolution : solved vaut None si un budget l'a interrompue.
+
+    Pour les modes approchés (beam, layerbeam, wastar), moves est alors la meilleure
+    réponse partielle et partial sa qualité (voir report_partial()).
+    """
+
+    def __init__(self, algorithm, heuristic, solved, moves, explored_states, time, partial=None):
+        self.algorithm = algorithm
+        self.heuristic = heuristic
+        self.solved = solved
+        self.moves = moves
+        self.explored_states = explored_states
+        self.time = time
+        self.partial = partial
+
+    @property
+    def interrupted(self):
+        return self.solved is None
+
+    def as_dict(self):
+        """Le résultat sous forme de dictionnaire sérialisable en JSON."""
+        return {
+            "algorithm": self.algorithm,
+            "heuristic": self.heuristic,
+            "solved": self.solved,
+            "moves": [list(move) for move in self.moves],
+            "explored_states": self.explored_states,
+            "time": round(self.time, 6),
+            "partial": self.partial,
+        }
+
+
+class DepthFirstSearch:
+    """DFS itérative à pile explicite, interruptible et reprenable.
+
+    La pile ne contient que des entiers : l'état de chaque profondeur et
+    l'indice du prochain saut à essayer dans geometry.moves. Le coup joué à
+    la profondeur d est donc geometry.moves[cursors[d] - 1] et le chemin
+    n'est reconstruit qu'une fois la cible atteinte. Avec un historique
+    (voir history.py), les sauts sont essayés dans l'ordre history.order,
+    où pointent alors les curseurs, et la recherche s'arrête sur les
+    positions gagnantes connues.
+    """
+
+    def __init__(self, geometry, state, goal, table=None, pruner=None, meet=None, horizon=None, history=None):
+        self.geometry = geometry
+        self.goal = goal
+        self.table = table
+        self.pruner = pruner
+        self.meet = meet
+        self.horizon = horizon
+        self.order = history.order if history is not None else None
+        self.winning = history.winning if history is not None else None
+        self.states = [state]
+        self.cursors = [0]
+        self.keys = [table.key(state) if table is not None else None]
+        self.explored = 0
+        self.deepest = 1
+
+    def run(self, solution_moves, node_limit=None, time_limit=None, checkpoint=None, checkpoint_interval=None,
+            cancel=None, observer=None):
+        """Poursuit la recherche ; retourne True, False, ou None si un budget l'a interrompue.
+
+        À l'interruption (budget en nœuds ou en secondes, ou Ctrl-C), la pile
+        est écrite dans checkpoint si fourni ; checkpoint_interval (secondes)
+        ajoute des sauvegardes régulières en cours de route. cancel est un
+        événement (multiprocessing.Event) qui arrête la recherche s'il est levé.
+        observer (voir instrumentation.py) reçoit counters() tous les
+        observer.every nœuds.
+        """
+        geometry = self.geometry
+        moves = geometry.moves if self.order is None else [geometry.moves[jump] for jump in self.order]
+        count = len(moves)
+        goal, table, pruner = self.goal, self.table, self.pruner
+        meet, horizon, winning = self.meet, self.horizon, self.winning
+        states, cursors, keys = self.states, self.cursors, self.keys
+        key_of = probe = store = dead = None
+        if table is not None:
+            key_of, probe, store = table.key, table.probe, table.store
+        if pruner is not None:
+            dead = pruner.dead
+        step = 4096
+        if observer is not None:
+            key_of, probe, store = (observer.wrap("hash", function) for function in (key_of, probe, store))
+            dead = observer.wrap("heuristic", dead)
+            step = observer.every
+
+        start = time.perf_counter()
+        deadline = start + time_limit if time_limit is not None else None
+        next_save = start + checkpoint_interval if checkpoint_interval is not None else None
+        stop_at = self.explored + node_limit if node_limit is not None else None
+        check_at = self.explored
+
+        try:
+            while states:
+                if self.explored >= check_at:
+                    check_at = self.explored + step
+                    if observer is not None:
+                        observer.update(**self.counters())
+                    if stop_at is not None:
+                        if self.explored >= stop_at:
+                            self.suspend(checkpoint)
+                            return None
+                        check_at = min(check_at, stop_at)
+                    if cancel is not None and cancel.is_set():
+                        return None
+                    if deadline is not None or next_save is not None:
+                        now = time.perf_counter()
+                        if deadline is not None and now >= deadline:
+                            self.suspend(checkpoint)
+                            return None
+                        if next_save is not None and now >= next_save:
+                            self.suspend(checkpoint)
+                            next_save = now + checkpoint_interval
+
+                state = states[-1]
+                i = cursors[-1]
+                while i < count:
+                    mask, pre, _ = moves[i]
+                    i += 1
+                    if state & mask == pre:
+                        break
+                else:
+                    # Tous les sauts ont échoué : l'état est mort.
+                    states.pop()
+                    cursors.pop()
+                    key = keys.pop()
+                    if table is not None:
+                        store(key)
+                    continue
+
+                cursors[-1] = i
+                child = state ^ mask
+                if len(states) == horizon:
+                    # Profondeur de la frontière arrière : hors de meet, pas d'issue.
+                    if child in meet:
+                        solution_moves.extend(moves[cursor - 1][2] for cursor in cursors)
+                        solution_moves.extend(backward_path(geometry, meet, child, goal))
+                        self.finish(checkpoint)
+                        return True
+                    continue
+                if child == goal:
+                    solution_moves.extend(moves[cursor - 1][2] for cursor in cursors)
+                    self.finish(checkpoint)
+                    return True
+                if winning is not None and child in winning:
+                    # Position gagnante connue : la fin de la solution est dans l'historique.
+                    solution_moves.extend(moves[cursor - 1][2] for cursor in cursors)
+                    solution_moves.extend(backward_path(geometry, winning, child, goal))
+                    self.finish(checkpoint)
+                    return True
+
+                if dead is not None and dead(child):
+                    continue
+
+                key = None
+                if table is not None:
+                    key = key_of(child)
+                    if probe(key):
+                        continue
+
+                self.explored += 1
+                states.append(child)
+                cursors.append(0)
+                keys.append(key)
+                if len(states) > self.deepest:
+                    self.deepest = len(states)
+        except KeyboardInterrupt:
+            self.suspend(checkpoint)
+            raise
+
+        self.finish(checkpoint)
+        return False
+
+    def counters(self):
+        """Compteurs de la recherche pour un observer."""
+        duplicates = self.table.hits if self.table is not None else 0
+        pruned = self.pruner.pruned if self.pruner is not None else 0
+        return {
+            "expanded": self.explored,
+            "generated": self.explored + duplicates + pruned,
+            "duplicates": duplicates,
+            "depth": len(self.states),
+            "frontier": len(self.states),
+        }
+
+    def suspend(self, checkpoint):
+        """Écrit la pile (et les états morts connus) dans le fichier checkpoint."""
+        if checkpoint is None:
+            return
+        data = {
+            "size": self.geometry.size,
+            "goal": self.goal,
+            "explored": self.explored,
+            "states": self.states,
+            "cursors": self.cursors,
+            "order": self.order,
+            "dead": list(self.table.entries) if self.table is not None else [],
+        }
+        with open(checkpoint + ".tmp", "w") as file:
+            json.dump(data, file)
+        os.replace(checkpoint + ".tmp", checkpoint)
+
+    def finish(self, checkpoint):
+        """Supprime le checkpoint d'une recherche terminée."""
+        if checkpoint is not None and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+    @classmethod
+    def resume(cls, geometry, goal, checkpoint, table=None, pruner=None, history=None, start=None):
+        """Recrée une recherche à partir d'un fichier écrit par suspend().
+
+        Les curseurs restent ceux de l'ordre des sauts du checkpoint ; history
+        n'apporte que ses positions gagnantes. Si start est fourni, le
+        checkpoint doit avoir été écrit pour une recherche partie de start.
+        """
+        with open(checkpoint) as file:
+            data = json.load(file)
+        if data["size"] != geometry.size or data["goal"] != goal:
+            raise ValueError(f"Le checkpoint {checkpoint} ne correspond pas à ce plateau et à cette cible.")
+        if start is not None and data["states"][0] != start:
+            raise ValueError(f"Le checkpoint {checkpoint} a été écrit pour un autre état de départ.")
+        search = cls(geometry, data["states"][0], goal, table, pruner, history=history)
+        search.order = data.get("order")
+        search.states = data["states"]
+        search.cursors = data["cursors"]
+        search.explored = data["explored"]
+        if table is not None:
+            for key in data["dead"]:
+                table.store(key)
+            search.keys = [table.key(state) for state in search.states]
+        else:
+            search.keys = [None] * len(search.states)
+        return search
+
+
+def report(stats, frontier, stored):
+    """Renseigne stats, s'il est fourni, en fin de recherche."""
+    if stats is not None:
+        stats["frontier"] = frontier
+        stats["stored"] = stored
+
+
+def dfs(geometry, state, goal, explored_states, solution_moves, table=None, checkpoint=None,
+        node_limit=None, time_limit=None, checkpoint_interval=None, cancel=None, pruner=None, stats=None,
+        observer=None, history=None):
+    """Recherche en profondeur depuis state jusqu'à l'état goal.
+
+    Si table (voir transposition.py) est fourni, les états dont tous les
+    sous-arbres ont échoué y sont mémorisés et ne sont plus réexplorés. Si le
+    fichier checkpoint existe, la recherche reprend là où il l'avait laissée.
+    pruner (voir pruning.py) rejette d'emblée les paires sans solution et
+    coupe les branches mortes.
+    Retourne None quand node_limit ou time_limit interrompt la recherche.
+    stats, un dictionnaire, reçoit la taille maximale de la frontière
+    ("frontier") et le nombre d'états gardés en mémoire ("stored").
+    observer (voir instrumentation.py) suit l'avancement.
+    history (voir history.py) ordonne les sauts et fournit les positions
+    gagnantes connues : si state en est une, la solution est relue sans
+    recherche.
+    """
+    if state == goal:
+        return True
+    if history is not None and state in history.winning:
+        solution_moves.extend(backward_path(geometry, history.winning, state, goal))
+        return True
+
+    if checkpoint is not None and os.path.exists(checkpoint):
+        search = DepthFirstSearch.resume(geometry, goal, checkpoint, table, pruner, history, state)
+        explored = search.explored
+    else:
+        if pruner is not None and not pruner.solvable(state):
+            return False
+        search = DepthFirstSearch(geometry, state, goal, table, pruner, history=history)
+        if table is not None and table.probe(search.keys[0]):
+            return False
+        explored = 0
+        search.explored = 1
+
+    if observer is not None:
+        observer.start("dfs")
+    solved = search.run(solution_moves, node_limit, time_limit, checkpoint, checkpoint_interval, cancel, observer)
+    explored_states[0] += search.explored - explored
+    report(stats, search.deepest, len(table) if table is not None else 0)
+    if observer is not None:
+        observer.done(solved, **search.counters())
+    return solved
+
+
+def backward_frontier(geometry, state, goal, max_states, pruner=None):
+    """Couches complètes des états d'où goal est atteignable, en remontant depuis goal par des sauts inverses.
+
+    Un saut inverse (masque, prérequis) est jouable si seule l'arrivée est
+    pleine, soit state & masque == masque ^ prérequis. Retourne le
+    dictionnaire état -> indice du saut qui le rapproche de goal, et le
+    nombre de sauts couverts. Les couches s'arrêtent avant de dépasser
+    max_states états, ou en atteignant le nombre de billes de state.
+    pruner, construit pour le jeu dual (voir bidirectional_search), écarte
+    les états que state ne peut pas atteindre.
+    """
+    moves_into = geometry.moves_into
+    index = {entry: i for i, entry in enumerate(geometry.moves)}
+    full = geometry.full
+    distance = state.bit_count() - goal.bit_count()
+    meet = {goal: -1}
+    layer = [goal]
+    depth = 0
+    while depth < distance:
+        next_layer = {}
+        for current in layer:
+            pegs = current
+            while pegs:
+                low = pegs & -pegs
+                for entry in moves_into[low.bit_length() - 1]:
+                    mask, pre, _ = entry
+                    if current & mask == mask ^ pre:
+                        parent = current ^ mask
+                        if parent in meet or parent in next_layer:
+                            continue
+                        if pruner is not None and pruner.dead(full ^ parent):
+                            continue
+                        next_layer[parent] = index[entry]
+                pegs ^= low
+            if len(meet) + len(next_layer) > max_states:
+                return meet, depth
+        if not next_layer:
+            # Plus aucun état en amont : les couches suivantes sont vides.
+            return meet, distance
+        meet.update(next_layer)
+        layer = list(next_layer)
+        depth += 1
+    return meet, depth
+
+
+def backward_path(geometry, meet, state, goal):
+    """Coups menant de state, état de la frontière arrière, jusqu'à goal."""
+    moves = geometry.moves
+    path = []
+    while state != goal:
+        mask, _, move = moves[meet[state]]
+        path.append(move)
+        state ^= mask
+    return path
+
+
+def bidirectional_search(geometry, state, goal, explored_states, solution_moves, table=None, pruner=None,
+                         max_states=1_000_000, node_limit=None, time_limit=None, stats=None, observer=None):
+    """Recherche bidirectionnelle : frontière arrière depuis goal, puis DFS avant jusqu'à la rencontrer.
+
+    Chaque saut retire une bille : les deux côtés se rejoignent donc à un
+    nombre de billes fixé. L'arrière est un parcours en largeur par sauts
+    inverses, borné à max_states états ; l'avant est la DFS de dfs(), avec
+    sa table d'états morts bornée, qui s'arrête à la profondeur de la
+    frontière arrière et n'y garde que les états qu'elle contient. Côté
+    arrière, l'élagage joue le jeu dual (billes et trous échangés), où
+    remonter vers state revient à avancer vers son complément.
+    Retourne None quand node_limit ou time_limit interrompt la DFS avant.
+    stats reçoit les mêmes clés que dans dfs(), la frontière arrière
+    comptant dans "stored" ; observer ne suit que la DFS avant.
+    """
+    if state == goal:
+        return True
+    if pruner is not None and not pruner.solvable(state):
+        return False
+    dual = Pruner(geometry, geometry.full ^ state) if pruner is not None else None
+    meet, depth = backward_frontier(geometry, state, goal, max_states, dual)
+    explored_states[0] += len(meet)
+    report(stats, len(meet), len(meet))
+    if state in meet:
+        solution_moves.extend(backward_path(geometry, meet, state, goal))
+        return True
+    if depth == state.bit_count() - goal.bit_count():
+        return False
+    horizon = state.bit_count() - goal.bit_count() - depth
+    search = DepthFirstSearch(geometry, state, goal, table, pruner, meet if depth else None, horizon if depth else None)
+    if table is not None and table.probe(search.keys[0]):
+        return False
+    search.explored = 1
+    if observer is not None:
+        observer.start("bidir")
+    solved = search.run(solution_moves, node_limit, time_limit, observer=observer)
+    explored_states[0] += search.explored
+    report(stats, len(meet) + search.deepest, len(meet) + (len(table) if table is not None else 0))
+    if observer is not None:
+        observer.done(solved, **search.counters())
+    return solved
+
+
+class NodeStore:
+    """Nœuds des recherches best-first, rangés dans des tableaux compacts.
+
+    Un nœud n'est qu'un indice : son état, son parent, l'indice du saut qui
+    y mène et sa profondeur sont dans des array parallèles. Le chemin n'est
+    reconstruit, en remontant les parents, qu'une fois la cible atteinte.
+    Avec un budget mémoire, les nœuds déversés passent dans archive (voir
+    external.py) et archived les compte.
+    """
+
+    def __init__(self, geometry):
+        self.geometry = geometry
+        self.states = array("Q") if geometry.size <= 64 else []
+        self.parents = array("l")
+        self.jumps = array("H")
+        self.depths = array("B")
+        self.archive = None
+        self.archived = 0
+
+    def __len__(self):
+        return self.archived + len(self.states)
+
+    def add(self, state, parent, jump, depth):
+        """Ajoute un nœud et retourne son indice."""
+        self.states.append(state)
+        self.parents.append(parent)
+        self.jumps.append(jump)
+        self.depths.append(depth)
+        return len(self.states) - 1
+
+    def path(self, node):
+        """Coups menant de la racine au nœud."""
+        moves = self.geometry.moves
+        path = []
+        while self.parents[node] >= 0:
+            path.append(moves[self.jumps[node]][2])
+            node = self.parents[node]
+        if self.parents[node] < -1:
+            path.extend(moves[jump][2] for jump in self.archive.path(-self.parents[node] - 2))
+        path.reverse()
+        return path
+
+
+# Une entrée de tas est l'entier (priorité << NODE_BITS) | nœud : les
+# priorités égales sont départagées par l'ordre de création des nœuds, sans
+# jamais comparer de plateaux, et le tas ne contient aucun tuple. A* glisse
+# entre les deux DEPTH_BITS bits qui font passer les nœuds profonds d'abord.
+NODE_BITS = 32
+NODE_MASK = (1 << NODE_BITS) - 1
+DEPTH_BITS = 8
+DEPTH_MASK = (1 << DEPTH_BITS) - 1
+
+
+class Budget:
+    """Budgets en nœuds et en secondes des recherches best-first et d'IDA*, et suivi par un observer.
+
+    La boucle compare son compteur de nœuds à un seuil (infini sans budget,
+    observer ni mémoire externe) et n'appelle check() qu'une fois le seuil
+    atteint.
+    """
+
+    def __init__(self, explored, node_limit=None, time_limit=None, observer=None, memory=None):
+        self.observer = observer
+        self.step = observer.every if observer is not None else 4096
+        self.stop_at = explored + node_limit if node_limit is not None else None
+        self.deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        if observer is None and node_limit is None and time_limit is None and memory is None:
+            self.first = float("inf")
+        else:
+            self.first = self.next_check(explored)
+
+    def next_check(self, explored):
+        """Prochain seuil de vérification."""
+        next_check = explored + self.step
+        if self.stop_at is not None:
+            next_check = min(next_check, self.stop_at)
+        return next_check
+
+    def check(self, explored, counters):
+        """Seuil suivant, ou None si un budget est épuisé ; counters() fournit les compteurs de l'observer."""
+        if self.observer is not None:
+            self.observer.update(**counters())
+        if self.stop_at is not None and explored >= self.stop_at:
+            return None
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            return None
+        return self.next_check(explored)
+
+
+def best_first_counters(nodes, visited, pq, pruner, popped, depth, bound=None, memory=None):
+    """Compteurs d'une recherche best-first pour un observer (bound : f du nœud courant pour A*)."""
+    pruned = pruner.pruned if pruner is not None else 0
+    expanded = len(visited) + (memory.closed if memory is not None else 0)
+    counters = {
+        "expanded": expanded,
+        "generated": len(nodes) - 1 + pruned,
+        "duplicates": popped - expanded,
+        "depth": depth,
+        "frontier": len(pq) + (memory.waiting() if memory is not None else 0),
+    }
+    if bound is not None:
+        counters["bound"] = bound
+    return counters
+
+
+PARTIAL_KEYS = ("pegs", "distance", "lower_bound", "gap")
+
+
+def report_partial(geometry, nodes, start, goal, solution_moves, stats, memory=None):
+    """Met dans solution_moves la meilleure réponse partielle de nodes, et sa qualité dans stats.
+
+    La meilleure réponse est le nœud qui laisse le moins de billes, puis
+    dont les billes sont le plus près de la cible (somme des distances de
+    Manhattan), parmi les nœuds en mémoire et le meilleur nœud déversé
+    retenu par memory (voir external.ExternalMemory.keep_partial()). lower_bound est la borne des classes de
+    position (voir pruning.peg_lower_bound()) pour l'état de départ start :
+    une borne prouvée mais faible, qui vaut 1 pour toute paire acceptée par
+    le Pruner. gap est le nombre de billes en trop par rapport à elle.
+    """
+    depths, states = nodes.depths, nodes.states
+    weights = distance_weights(geometry, *geometry.cells[goal.bit_length() - 1])
+    deepest = max(depths)
+    best = min((node for node, depth in enumerate(depths) if depth == deepest),
+               key=lambda node: geometry.weigh(states[node], weights))
+    spilled = memory.partial if memory is not None else None
+    if spilled is not None and spilled[:2] < (-deepest, geometry.weigh(states[best], weights)):
+        _, _, state, node = spilled
+        solution_moves.extend(geometry.moves[jump][2] for jump in reversed(memory.archive.path(node)))
+        report_quality(geometry, state, start, goal, stats)
+        return
+    solution_moves.extend(nodes.path(best))
+    report_quality(geometry, states[best], start, goal, stats)
+
+
+def report_quality(geometry, best, start, goal, stats):
+    """Renseigne dans stats les clés PARTIAL_KEYS de la réponse partielle qui aboutit à l'état best."""
+    if stats is None:
+        return
+    weights = distance_weights(geometry, *geometry.cells[goal.bit_length() - 1])
+    pegs = best.bit_count()
+    bound = peg_lower_bound(geometry, start)
+    stats["pegs"] = pegs
+    stats["distance"] = geometry.weigh(best, weights) - pegs
+    stats["lower_bound"] = bound
+    stats["gap"] = pegs - bound
+
+
+def greedy_best_first_search(geometry, state, goal, heuristic, explored_states, solution_moves, pruner=None, stats=None,
+                             observer=None, node_limit=None, time_limit=None, memory_limit=None, spill_dir=None):
+    """Recherche gloutonne guidée par heuristic (voir heuristics.py).
+
+    L'heuristique n'est calculée en entier que pour l'état initial : chaque
+    entrée du tas porte sa valeur, mise à jour par la variation précalculée
+    du saut. Les états que pruner (par défaut celui de l'heuristique)
+    déclare sans issue sont écartés. stats et observer : voir dfs() ;
+    node_limit et time_limit interrompent la recherche (retour None).
+    Avec memory_limit (en octets), le tas, les états développés et les
+    nœuds débordent dans un dossier temporaire de spill_dir quand leur
+    taille estimée dépasse le budget (voir external.py).
+    """
+    if pruner is None:
+        pruner = heuristic.pruner
+    if pruner is not None and not pruner.solvable(state):
+        return False
+    jumps = geometry.scored_moves(heuristic.weights)
+    nodes = NodeStore(geometry)
+    states, parents, node_jumps, depths = nodes.states, nodes.parents, nodes.jumps, nodes.depths
+    pq = []
+    visited = set()
+    heappush(pq, heuristic.value(state) << NODE_BITS | nodes.add(state, -1, 0, 0))
+    push, pop, seen, mark = heappush, heappop, visited.__contains__, visited.add
+    dead = pruner.dead if pruner is not None else None
+    base = explored_states[0]
+    if observer is not None:
+        push, pop = observer.wrap("heap", push), observer.wrap("heap", pop)
+        seen, mark = observer.wrap("hash", seen), observer.wrap("hash", mark)
+        dead = observer.wrap("heuristic", dead)
+        observer.start("gbfs")
+    memory = ExternalMemory(geometry, nodes, visited, memory_limit, spill_dir) if memory_limit is not None else None
+    budget = Budget(base, node_limit, time_limit, observer, memory)
+    check_at = budget.first
+
+    peak = 0
+    while pq or memory is not None and memory.waiting():
+        if len(pq) > peak:
+            peak = len(pq)
+        entry = pop(pq)
+        score, node = entry >> NODE_BITS, entry & NODE_MASK
+        state = states[node]
+
+        if state == goal:
+            solution_moves.extend(nodes.path(node))
+            report(stats, peak, len(nodes))
+            if observer is not None:
+                observer.done(True, **best_first_counters(nodes, visited, pq, pruner, explored_states[0] - base, depths[node],
+                                                          memory=memory))
+            return True
+
+        explored_states[0] += 1
+        if explored_states[0] >= check_at:
+            check_at = budget.check(explored_states[0], lambda: best_first_counters(
+                nodes, visited, pq, pruner, explored_states[0] - base, depths[node], memory=memory))
+            if check_at is None:
+                report(stats, peak, len(nodes))
+                if observer is not None:
+                    observer.done(None, **best_first_counters(nodes, visited, pq, pruner, explored_states[0] - base,
+                                                              depths[node], memory=memory))
+                return None
+            if memory is not None and memory.full(pq):
+                node = memory.spill(pq, node)
+                pop, seen = memory.pop, memory.seen
+                if observer is not None:
+                    pop, seen = observer.wrap("heap", pop), observer.wrap("hash", seen)
+        if seen(state):
+            continue
+
+        mark(state)
+
+        depth = depths[node] + 1
+        for mask, pre, jump, delta in jumps:
+            if state & mask == pre:
+                child = state ^ mask
+                if dead is not None and dead(child):
+                    continue
+                push(pq, (score + delta) << NODE_BITS | len(states))
+                states.append(child)
+                parents.append(node)
+                node_jumps.append(jump)
+                depths.append(depth)
+
+    report(stats, peak, len(nodes))
+    if observer is not None:
+        observer.done(False, **best_first_counters(nodes, visited, pq, pruner, explored_states[0] - base, 0, memory=memory))
+    return False
+
+
+def a_star_search(geometry, state, goal, heuristic, explored_states, solution_moves, pruner=None, stats=None,
+                  observer=None, node_limit=None, time_limit=None, memory_limit=None, spill_dir=None, weight=1,
+                  partial=False):
+    """Recherche A* avec f(n) = g(n) + h(n), h étant heuristic (voir heuristics.py).
+
+    Comme pour la recherche gloutonne, f est mis à jour de 1 + la variation
+    précalculée du saut au lieu d'être recalculé sur tout le plateau ; g est
+    la profondeur du nœud. À f égal, les nœuds les plus profonds passent
+    en premier : avec une heuristique exacte comme "pegs", où f est le même
+    partout, A* plonge au lieu de parcourir l'arbre en largeur.
+    stats, observer, node_limit, time_limit, memory_limit et spill_dir : voir
+    greedy_best_first_search(). Avec weight, f = g + weight * h (A* pondéré,
+    weight est arrondi à une fraction pour garder des priorités entières).
+    Avec partial, une recherche arrêtée par un budget laisse sa meilleure
+    réponse partielle dans solution_moves (voir report_partial()) ; une
+    recherche épuisée (retour False) n'y laisse rien.
+    """
+    if pruner is None:
+        pruner = heuristic.pruner
+    if pruner is not None and not pruner.solvable(state):
+        return False
+    start = state
+    jumps = geometry.scored_moves(heuristic.weights)
+    weight = Fraction(weight).limit_denominator(100)
+    step = weight.denominator
+    if weight != 1:
+        jumps = [(mask, pre, jump, weight.numerator * delta) for mask, pre, jump, delta in jumps]
+    nodes = NodeStore(geometry)
+    states, parents, node_jumps, depths = nodes.states, nodes.parents, nodes.jumps, nodes.depths
+    pq = []
+    visited = set()
+    heappush(pq, (weight.numerator * heuristic.value(state) << DEPTH_BITS | DEPTH_MASK) << NODE_BITS
+             | nodes.add(state, -1, 0, 0))
+    push, pop, seen, mark = heappush, heappop, visited.__contains__, visited.add
+    dead = pruner.dead if pruner is not None else None
+    base = explored_states[0]
+    if observer is not None:
+        push, pop = observer.wrap("heap", push), observer.wrap("heap", pop)
+        seen, mark = observer.wrap("hash", seen), observer.wrap("hash", mark)
+        dead = observer.wrap("heuristic", dead)
+        observer.start("astar")
+    memory = None
+    if memory_limit is not None:
+        weights = distance_weights(geometry, *geometry.cells[goal.bit_length() - 1]) if partial else None
+        memory = ExternalMemory(geometry, nodes, visited, memory_limit, spill_dir, weights)
+    budget = Budget(base, node_limit, time_limit, observer, memory)
+    check_at = budget.first
+
+    peak = 0
+    while pq or memory is not None and memory.waiting():
+        if len(pq) > peak:
+            peak = len(pq)
+        entry = pop(pq)
+        score, node = entry >> (NODE_BITS + DEPTH_BITS), entry & NODE_MASK
+        state = states[node]
+
+        if state == goal:
+            solution_moves.extend(nodes.path(node))
+            report(stats, peak, len(nodes))
+            if observer is not None:
+                observer.done(True, **best_first_counters(nodes, visited, pq, pruner, explored_states[0] - base, depths[node],
+                                                          score, memory=memory))
+            return True
+
+        explored_states[0] += 1
+        if explored_states[0] >= check_at:
+            check_at = budget.check(explored_states[0], lambda: best_first_counters(
+                nodes, visited, pq, pruner, explored_states[0] - base, depths[node], score, memory=memory))
+            if check_at is None:
+                report(stats, peak, len(nodes))
+                if observer is not None:
+                    observer.done(None, **best_first_counters(nodes, visited, pq, pruner, explored_states[0] - base,
+                                                              depths[node], score, memory=memory))
+                if partial:
+                    report_partial(geometry, nodes, start, goal, solution_moves, stats, memory)
+                return None
+            if memory is not None and memory.full(pq):
+                node = memory.spill(pq, node)
+                pop, seen = memory.pop, memory.seen
+                if observer is not None:
+                    pop, seen = observer.wrap("heap", pop), observer.wrap("hash", seen)
+        if seen(state):
+            continue
+
+        mark(state)
+
+        depth = depths[node] + 1
+        for mask, pre, jump, delta in jumps:
+            if state & mask == pre:
+                child = state ^ mask
+                if dead is not None and dead(child):
+                    continue
+                push(pq, ((score + step + delta) << DEPTH_BITS | DEPTH_MASK - depth) << NODE_BITS | len(states))
+                states.append(child)
+                parents.append(node)
+                node_jumps.append(jump)
+                depths.append(depth)
+
+    report(stats, peak, len(nodes))
+    if observer is not None:
+        observer.done(False, **best_first_counters(nodes, visited, pq, pruner, explored_states[0] - base, 0, score,
+                                                   memory=memory))
+    return False
+
+
+def weighted_a_star(geometry, state, goal, heuristic, explored_states, solution_moves, weight=2.0, pruner=None,
+                    stats=None, observer=None, node_limit=None, time_limit=None, memory_limit=None):
+    """A* pondéré (f = g + weight * h) qui rend, à l'échéance, sa meilleure réponse partielle.
+
+    Toute solution depuis n billes compte n - 1 coups : la première trouvée
+    est déjà optimale et des relances à poids décroissant (A* « anytime »)
+    n'auraient rien à améliorer. Seule la réponse partielle dépend du poids
+    (voir report_partial()) : un poids supérieur à 1 fait plonger la
+    recherche vers les états à peu de billes.
+    """
+    return a_star_search(geometry, state, goal, heuristic, explored_states, solution_moves, pruner, stats, observer,
+                         node_limit, time_limit, memory_limit, weight=weight, partial=True)
+
+
+def beam_search(geometry, state, goal, heuristic, explored_states, solution_moves, width=1000, pruner=None, stats=None,
+                observer=None, node_limit=None, time_limit=None):
+    """Recherche en faisceau : chaque couche (une bille de moins) ne garde que ses width meilleurs états.
+
+    Les états sont classés par heuristic, mise à jour par saut comme pour la
+    recherche gloutonne. La recherche est incomplète : si la cible n'est pas
+    atteinte après qu'une couche a été coupée, ou si le budget est épuisé,
+    elle retourne None et laisse sa meilleure réponse partielle dans
+    solution_moves (voir report_partial()). Si aucune couche n'a été
+    coupée, le parcours était exhaustif et elle retourne False.
+    """
+    if state == goal:
+        return True
+    if pruner is None:
+        pruner = heuristic.pruner
+    if pruner is not None and not pruner.solvable(state):
+        return False
+    start = state
+    jumps = geometry.scored_moves(heuristic.weights)
+    nodes = NodeStore(geometry)
+    states = nodes.states
+    layer = [(heuristic.value(state), nodes.add(state, -1, 0, 0))]
+    peak = 1
+    dead = pruner.dead if pruner is not None else None
+    base = explored_states[0]
+    if observer is not None:
+        dead = observer.wrap("heuristic", dead)
+        observer.start("beam")
+    budget = Budget(base, node_limit, time_limit, observer)
+    check_at = budget.first
+    depth = 0
+    truncated = False
+
+    def counters():
+        expanded = explored_states[0] - base
+        pruned = pruner.pruned if pruner is not None else 0
+        return {"expanded": expanded, "generated": len(nodes) - 1 + pruned, "duplicates": 0, "depth": depth,
+                "frontier": len(layer)}
+
+    while layer:
+        depth += 1
+        seen = set()
+        children = []
+        for score, node in layer:
+            current = states[node]
+            explored_states[0] += 1
+            if explored_states[0] >= check_at:
+                check_at = budget.check(explored_states[0], counters)
+                if check_at is None:
+                    break
+            for mask, pre, jump, delta in jumps:
+                if current & mask == pre:
+                    child = current ^ mask
+                    if child == goal:
+                        solution_moves.extend(nodes.path(node))
+                        solution_moves.append(geometry.moves[jump][2])
+                        report(stats, peak, len(nodes))
+                        if observer is not None:
+                            observer.done(True, **counters())
+                        return True
+                    if child in seen or dead is not None and dead(child):
+                        continue
+                    seen.add(child)
+                    children.append((score + delta, child, node, jump))
+        if check_at is None:
+            break
+        truncated = truncated or len(children) > width
+        layer = [(score, nodes.add(child, node, jump, depth)) for score, child, node, jump in nsmallest(width, children)]
+        peak = max(peak, len(layer))
+
+    report(stats, peak, len(nodes))
+    solved = None if truncated or check_at is None else False
+    if observer is not None:
+        observer.done(solved, **counters())
+    if solved is None:
+        report_partial(geometry, nodes, start, goal, solution_moves, stats)
+    return solved
+
+
+def ida_star_search(geometry, state, goal, heuristic, explored_states, solution_moves, pruner=None, stats=None,
+                    observer=None, node_limit=None, time_limit=None):
+    """IDA* : DFS itérative bornée par f = g + h, relancée avec la borne suivante.
+
+    La mémoire est linéaire en la profondeur (une pile d'états, de curseurs
+    et de valeurs h) ; avec une heuristique admissible la solution trouvée
+    est optimale. stats, observer, node_limit et time_limit : voir
+    greedy_best_first_search() ; l'observer reçoit en plus la borne f
+    courante ("bound").
+    """
+    if state == goal:
+        return True
+    if pruner is None:
+        pruner = heuristic.pruner
+    if pruner is not None and not pruner.solvable(state):
+        return False
+
+    jumps = geometry.scored_moves(heuristic.weights)
+    count = len(jumps)
+    bound = heuristic.value(state)
+    deepest = 1
+    dead = pruner.dead if pruner is not None else None
+    base = explored_states[0]
+    if observer is not None:
+        dead = observer.wrap("heuristic", dead)
+        observer.start("idastar")
+    budget = Budget(base, node_limit, time_limit, observer)
+    check_at = budget.first
+
+    def counters():
+        expanded = explored_states[0] - base
+        pruned = pruner.pruned if pruner is not None else 0
+        return {"expanded": expanded, "generated": expanded + pruned, "duplicates": 0, "depth": len(states),
+                "frontier": len(states), "bound": bound}
+
+    while True:
+        next_bound = None
+        states, cursors, scores = [state], [0], [heuristic.value(state)]
+        explored_states[0] += 1
+        while states:
+            current = states[-1]
+            i = cursors[-1]
+            while i < count:
+                mask, pre, _, delta = jumps[i]
+                i += 1
+                if current & mask == pre:
+                    break
+            else:
+                states.pop()
+                cursors.pop()
+                scores.pop()
+                continue
+
+            cursors[-1] = i
+            child = current ^ mask
+            if child == goal:
+                solution_moves.extend(geometry.moves[cursor - 1][2] for cursor in cursors)
+                report(stats, deepest, deepest)
+                if observer is not None:
+                    observer.done(True, **counters())
+                return True
+
+            h = scores[-1] + delta
+            f = len(states) + h
+            if f > bound:
+                if next_bound is None or f < next_bound:
+                    next_bound = f
+                continue
+            if dead is not None and dead(child):
+                continue
+
+            explored_states[0] += 1
+            states.append(child)
+            cursors.append(0)
+            scores.append(h)
+            if len(states) > deepest:
+                deepest = len(states)
+            if explored_states[0] >= check_at:
+                check_at = budget.check(explored_states[0], counters)
+                if check_at is None:
+                    report(stats, deepest, deepest)
+                    if observer is not None:
+                        observer.done(None, **counters())
+                    return None
+
+        if next_bound is None:
+            report(stats, deepest, deepest)
+            if observer is not None:
+                observer.done(False, **counters())
+            return False
+        bound = next_bound
@@ -0,0 +1,294 @@
+"""Service de résolution asyncio, sur TCP local ou socket Unix.
+
+Le protocole est du JSON-lines : une requête par ligne, une réponse par
+ligne, dans l'ordre des requêtes de la connexion.
+
+    {"start": [3, 3], "algorithm": "astar", "heuristic": "pagoda", "time_limit": 10}
+    {"geometry": "english", "board": [[-1, -1, 1, 1, 1, -1, -1], ...], "target": [3, 3], "node_limit": 1000000}
+    {"start": [2, 3], "target": [5, 3], "algorithm": "beam", "width": 200, "time_limit": 1}
+    {"command": "stats"}
+
+Les recherches (batch.solve_state) tournent dans un ProcessPoolExecutor,
+au plus workers à la fois. Les requêtes identiques en cours partagent la
+même recherche. Une réponse définitive (résolu ou sans solution) vaut quel
+que soit l'algorithme : elle est gardée dans un cache LRU dont la clé est la
+forme canonique du plateau (symétries qui fixent la cible) et la cible, et
+écrite dans une base SQLite consultée quand le cache ne la contient pas.
+
+    python service.py --unix /tmp/solitaire.sock
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import batch
+from bitboard import get_geometry
+from heuristics import HEURISTICS
+
+
+def parse_request(request):
+    """Valide une requête ; retourne (géométrie, état, cible, algorithme, heuristique, node_limit, time_limit, largeur, poids)."""
+    if not isinstance(request, dict):
+        raise ValueError("La requête doit être un objet JSON.")
+    geometry_name = request.get("geometry", "english")
+    geometry = get_geometry(geometry_name)
+
+    start = request.get("start")
+    board = request.get("board")
+    if (start is None) == (board is None):
+        raise ValueError("La requête doit donner soit start, soit board.")
+    if board is not None:
+        state = _board_state(geometry, board)
+    else:
+        state = geometry.start_state(*_cell(geometry, start, "start"))
+    target = request.get("target", start)
+    if target is None:
+        raise ValueError("target est obligatoire avec board.")
+    target = _cell(geometry, target, "target")
+
+    algorithm = request.get("algorithm", "dfs")
+    if algorithm not in batch.ALGORITHMS:
+        raise ValueError(f"Algorithme inconnu : {algorithm!r} (disponibles : {', '.join(batch.ALGORITHMS)})")
+    heuristic = request.get("heuristic", "distance")
+    if heuristic not in HEURISTICS:
+        raise ValueError(f"Heuristique inconnue : {heuristic!r} (disponibles : {', '.join(HEURISTICS)})")
+    node_limit = request.get("node_limit")
+    time_limit = request.get("time_limit")
+    if node_limit is not None and (not isinstance(node_limit, int) or node_limit <= 0):
+        raise ValueError(f"node_limit invalide : {node_limit!r}")
+    if time_limit is not None and (not isinstance(time_limit, (int, float)) or time_limit <= 0):
+        raise ValueError(f"time_limit invalide : {time_limit!r}")
+    beam_width = request.get("width", 1000)
+    weight = request.get("weight", 2.0)
+    if not isinstance(beam_width, int) or beam_width <= 0:
+        raise ValueError(f"width invalide : {beam_width!r}")
+    if not isinstance(weight, (int, float)) or weight <= 0:
+        raise ValueError(f"weight invalide : {weight!r}")
+    return geometry_name, state, target, algorithm, heuristic, node_limit, time_limit, beam_width, weight
+
+
+def _cell(geometry, value, label):
+    """Trou (x, y) d'une liste JSON [x, y]."""
+    cell = tuple(value) if isinstance(value, list) else None
+    if cell not in geometry.index:
+        raise ValueError(f"{label} hors de la zone jouable : {value!r}")
+    return cell
+
+
+def _board_state(geometry, board):
+    """État d'un plateau JSON (1 bille, 0 trou vide, -1 hors plateau)."""
+    layout = geometry.layout
+    if (not isinstance(board, list) or len(board) != len(layout)
+            or any(not isinstance(row, list) or len(row) != len(cells) for row, cells in zip(board, layout))):
+        raise ValueError(f"board doit faire {geometry.rows} x {geometry.cols} cases.")
+    for x, row in enumerate(board):
+        for y, cell in enumerate(row):
+            if cell not in ((0, 1) if (x, y) in geometry.index else (-1,)):
+                raise ValueError(f"Case ({x}, {y}) invalide : {cell!r}")
+    return geometry.encode(board)
+
+
+def canonical(geometry, state, goal):
+    """Retourne (forme canonique de state pour goal, permutation inverse qui ramène au repère de state, ou None)."""
+    best, best_perm = state, None
+    for perm, sym in zip(geometry.permutations, geometry.symmetries):
+        if geometry.transform(goal, sym) == goal:
+            image = geometry.transform(state, sym)
+            if image < best:
+                best, best_perm = image, perm
+    if best_perm is None:
+        return state, None
+    inverse = [0] * geometry.size
+    for i, j in enumerate(best_perm):
+        inverse[j] = i
+    return best, inverse
+
+
+def restore_moves(geometry, moves, inverse):
+    """Coups de la forme canonique, ramenés dans le repère de la requête."""
+    if inverse is None:
+        return moves
+    cells, index = geometry.cells, geometry.index
+    restored = []
+    for x1, y1, x2, y2 in moves:
+        restored.append([*cells[inverse[index[(x1, y1)]]], *cells[inverse[index[(x2, y2)]]]])
+    return restored
+
+
+class SolverService:
+    """Cache LRU, base SQLite, fusion des requêtes en cours et pool de processus borné."""
+
+    def __init__(self, database="service.sqlite", workers=None, cache_size=10_000, max_time_limit=60.0):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.slots = asyncio.Semaphore(self.workers)
+        self.max_time_limit = max_time_limit
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.inflight = {}
+        self.db = sqlite3.connect(database)
+        self.db.execute("CREATE TABLE IF NOT EXISTS solutions (geometry TEXT, state TEXT, target TEXT, result TEXT, "
+                        "PRIMARY KEY (geometry, state, target))")
+        self.db.commit()
+        self.counters = dict.fromkeys(("requests", "cache_hits", "database_hits", "merged", "searches", "errors"), 0)
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+        self.db.close()
+
+    def lookup(self, key):
+        """Résultat définitif connu pour key (cache puis SQLite), ou None."""
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.counters["cache_hits"] += 1
+            return self.cache[key]
+        geometry, state, target = key
+        row = self.db.execute("SELECT result FROM solutions WHERE geometry = ? AND state = ? AND target = ?",
+                              (geometry, str(state), f"{target[0]},{target[1]}")).fetchone()
+        if row is None:
+            return None
+        self.counters["database_hits"] += 1
+        result = json.loads(row[0])
+        self.cache_result(key, result)
+        return result
+
+    def cache_result(self, key, result):
+        self.cache[key] = result
+        self.cache.move_to_end(key)
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def remember(self, key, result):
+        """Garde un résultat définitif dans le cache et la base."""
+        self.cache_result(key, result)
+        geometry, state, target = key
+        self.db.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?)",
+                        (geometry, str(state), f"{target[0]},{target[1]}", json.dumps(result)))
+        self.db.commit()
+
+    async def search(self, job):
+        """Lance la recherche de job dans le pool et mémorise son résultat s'il est définitif."""
+        geometry_name, state, target, algorithm, heuristic, node_limit, time_limit, beam_width, weight = job
+        async with self.slots:
+            self.counters["searches"] += 1
+            result = await asyncio.get_running_loop().run_in_executor(
+                self.pool, batch.solve_state, state, target, algorithm, node_limit, time_limit, heuristic, True,
+                geometry_name, None, beam_width, weight)
+        if result["solved"] is not None:
+            self.remember((geometry_name, state, target), result)
+        return result
+
+    async def solve(self, request):
+        """Répond à une requête de résolution."""
+        geometry_name, state, target, algorithm, heuristic, node_limit, time_limit, beam_width, weight = \
+            parse_request(request)
+        if self.max_time_limit is not None:
+            time_limit = min(time_limit or self.max_time_limit, self.max_time_limit)
+        geometry = get_geometry(geometry_name)
+        state, inverse = canonical(geometry, state, geometry.bit(*target))
+
+        key = (geometry_name, state, target)
+        result = self.lookup(key)
+        cached = result is not None
+        if not cached:
+            job = key + (algorithm, heuristic, node_limit, time_limit, beam_width, weight)
+            future = self.inflight.get(job)
+            if future is None:
+                future = self.inflight[job] = asyncio.ensure_future(self.search(job))
+                future.add_done_callback(lambda _: self.inflight.pop(job, None))
+            else:
+                self.counters["merged"] += 1
+            result = await asyncio.shield(future)
+        return dict(result, moves=restore_moves(geometry, result["moves"], inverse), cached=cached)
+
+    async def handle(self, request):
+        """Réponse (dictionnaire) à une requête déjà décodée."""
+        self.counters["requests"] += 1
+        try:
+            if isinstance(request, dict) and request.get("command") == "stats":
+                response = dict(self.counters, cached=len(self.cache), inflight=len(self.inflight))
+            else:
+                response = await self.solve(request)
+        except ValueError as error:
+            self.counters["errors"] += 1
+            response = {"error": str(error)}
+        except Exception as error:
+            # Requête mal formée au-delà de parse_request, ou échec du processus de recherche :
+            # la connexion doit survivre et le client garder son id.
+            self.counters["errors"] += 1
+            response = {"error": f"{type(error).__name__} : {error}"}
+        if isinstance(request, dict) and "id" in request:
+            response["id"] = request["id"]
+        return response
+
+    async def serve_client(self, reader, writer):
+        """Traite les requêtes d'une connexion, une par ligne."""
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                except ValueError as error:
+                    self.counters["errors"] += 1
+                    response = {"error": f"JSON invalide : {error}"}
+                else:
+                    response = await self.handle(request)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(service, host="127.0.0.1", port=8765, unix=None):
+    """Sert service sur host:port, ou sur le socket Unix unix, jusqu'à interruption."""
+    if unix:
+        server = await asyncio.start_unix_server(service.serve_client, unix)
+    else:
+        server = await asyncio.start_server(service.serve_client, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def ask(request, host="127.0.0.1", port=8765, unix=None, timeout=None):
+    """Client synchrone : envoie une requête au service et retourne sa réponse."""
+    if unix:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.settimeout(timeout)
+        connection.connect(unix)
+    else:
+        connection = socket.create_connection((host, port), timeout)
+    with connection, connection.makefile("rwb") as stream:
+        stream.write(json.dumps(request).encode() + b"\n")
+        stream.flush()
+        return json.loads(stream.readline())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Service de résolution du solitaire chinois (JSON-lines).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="socket Unix à utiliser au lieu de TCP")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(), help="recherches simultanées")
+    parser.add_argument("--database", default="service.sqlite", help="base SQLite des résultats")
+    parser.add_argument("--cache-size", type=int, default=10_000, help="entrées du cache LRU")
+    parser.add_argument("--max-time-limit", type=float, default=60.0, help="budget en secondes maximal par recherche")
+    args = parser.parse_args(argv)
+
+    service = SolverService(args.database, args.workers, args.cache_size, args.max_time_limit)
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,68 @@
+import argparse
+import json
+import sys
 import time
-from heapq import heappush, heappop
+
+import history
+import parallel
+import retrograde
+import search
+import vectorized
+from batch import ALGORITHMS
+from bitboard import ENGLISH, GEOMETRIES
+from export import AsciiWriter
+from heuristics import HEURISTICS, get_heuristic
+from pruning import Pruner
+from transposition import TranspositionTable
 
 class SolitaireChinois:
-    def __init__(self):
-        self.board = [
-            [-1, -1, 1, 1, 1, -1, -1],
-            [-1, -1, 1, 1, 1, -1, -1],
-            [1, 1, 1, 1, 1, 1, 1],
-            [1, 1, 1, 1, 1, 1, 1],
-            [1, 1, 1, 1, 1, 1, 1],
-            [-1, -1, 1, 1, 1, -1, -1],
-            [-1, -1, 1, 1, 1, -1, -1],
-        ]
-
-        self.initial_empty = self.get_initial_empty_position()
-        self.final_target = self.get_final_target()
-        self.board[self.initial_empty[0]][self.initial_empty[1]] = 0
+    DEFAULT_HEURISTICS = {"gbfs": "distance", "astar": "distance", "idastar": "pagoda", "beam": "distance", "wastar": "distance",
+                          "layerbeam": "distance"}
+
+    def __init__(self, geometry=ENGLISH, initial_empty=None, final_target=None, board=None):
+        """Sans initial_empty ni board, les positions sont demandées au clavier.
+
+        board (liste de listes : 1 bille, 0 trou vide, -1 hors plateau)
+        remplace la position vide initiale ; final_target vaut par défaut
+        initial_empty.
+        """
+        self.geometry = geometry
+        interactive = initial_empty is None and board is None
+        if interactive:
+            initial_empty = self.get_initial_empty_position()
+        if board is None and tuple(initial_empty) not in geometry.index:
+            raise ValueError(f"Position vide initiale hors de la zone jouable : {initial_empty}")
+        if final_target is None:
+            final_target = self.get_final_target() if interactive else initial_empty
+        if final_target is None:
+            raise ValueError("final_target est obligatoire avec board.")
+        if tuple(final_target) not in geometry.index:
+            raise ValueError(f"Cible finale invalide : {final_target}")
+        self.initial_empty = initial_empty
+        self.final_target = tuple(final_target)
+        if board is not None:
+            self.initial_board = self.validate_board(board)
+        else:
+            self.initial_board = geometry.decode(geometry.start_state(*initial_empty))
+        self.board = [row[:] for row in self.initial_board]
         self.moves = []
+        self.max_dead_states = 2_000_000
+        self.eviction = "lru"
+        self.dead_states = None
+        self.pruning = True
+        self.memory_limit = None
+        self.pruner = None
+        self.database = None
+        self.observer = None
+        self.solutions = None
+        self.history = None
 
     def get_initial_empty_position(self):
         """Demande à l'utilisateur de saisir la position initiale vide et la valide."""
         while True:
             try:
-                x, y = map(int, input("Entrez la position vide initiale (x, y) entre 0 et 6 : ").split(","))
-                if (
-                    0 <= x < 7
-                    and 0 <= y < 7
-                    and self.board[x][y] == 1
-                ):
+                x, y = map(int, input(f"Entrez la position vide initiale (x, y) entre 0 et {self.geometry.rows - 1} : ").split(","))
+                if (x, y) in self.geometry.index:
                     return x, y
                 else:
                     print("Coordonnées invalides. Veuillez entrer des coordonnées valides dans la zone jouable.")
@@ -38,14 +73,25 @@ class SolitaireChinois:
         """Demande à l'utilisateur de saisir la position cible finale et la valide."""
         while True:
             try:
-                x, y = map(int, input("Entrez la position cible finale (x, y) entre 0 et 6 : ").split(","))
-                if 0 <= x < 7 and 0 <= y < 7 and self.board[x][y] == 1:
+                x, y = map(int, input(f"Entrez la position cible finale (x, y) entre 0 et {self.geometry.rows - 1} : ").split(","))
+                if (x, y) in self.geometry.index:
                     return x, y
                 else:
                     print("Coordonnées invalides. Veuillez entrer des coordonnées valides dans la zone jouable.")
             except ValueError:
                 print("Entrée invalide. Veuillez entrer deux entiers séparés par une virgule.")
 
+    def validate_board(self, board):
+        """Retourne une copie de board après avoir vérifié qu'il correspond à la géométrie."""
+        layout = self.geometry.layout
+        if len(board) != len(layout) or any(len(row) != len(cells) for row, cells in zip(board, layout)):
+            raise ValueError(f"Le plateau doit faire {self.geometry.rows} x {self.geometry.cols} cases.")
+        for x, row in enumerate(board):
+            for y, cell in enumerate(row):
+                if (cell in (0, 1)) != ((x, y) in self.geometry.index) or cell not in (-1, 0, 1):
+                    raise ValueError(f"Case ({x}, {y}) invalide : {cell}")
+        return [list(row) for row in board]
+
     def display_board(self):
         """Affiche l'état actuel du plateau."""
         for row in self.board:
@@ -54,16 +100,9 @@ class SolitaireChinois:
 
     def is_valid_move(self, x1, y1, x2, y2):
         """Vérifie si un déplacement de (x1, y1) à (x2, y2) est valide."""
-        if not (0 <= x1 < 7 and 0 <= y1 < 7 and 0 <= x2 < 7 and 0 <= y2 < 7):
-            return False
-        if self.board[x1][y1] != 1 or self.board[x2][y2] != 0:
+        if (x1, y1, x2, y2) not in self.geometry.jumps:
             return False
-        dx, dy = x2 - x1, y2 - y1
-        if abs(dx) == 2 and dy == 0 and self.board[x1 + dx // 2][y1] == 1:
-            return True
-        if abs(dy) == 2 and dx == 0 and self.board[x1][y1 + dy // 2] == 1:
-            return True
-        return False
+        return self.board[x1][y1] == 1 and self.board[(x1 + x2) // 2][(y1 + y2) // 2] == 1 and self.board[x2][y2] == 0
 
     def make_move(self, x1, y1, x2, y2):
         """Exécute un déplacement et supprime la bille sautée."""
@@ -86,132 +125,248 @@ class SolitaireChinois:
         return sum(row.count(1) for row in self.board) == 1 and self.board[self.final_target[0]][self.final_target[1]] == 1
 
     def get_possible_moves(self):
-        """Génère tous les déplacements valides."""
-        moves = []
-        for x1 in range(7):
-            for y1 in range(7):
-                if self.board[x1][y1] == 1:
-                    for dx, dy in [(-2, 0), (2, 0), (0, -2), (0, 2)]:
-                        x2, y2 = x1 + dx, y1 + dy
-                        if self.is_valid_move(x1, y1, x2, y2):
-                            moves.append((x1, y1, x2, y2))
-        return moves
-
-    def dfs(self, explored_states, solution_moves):
-        """Résout le puzzle en utilisant la recherche en profondeur (DFS) et stocke les mouvements de solution."""
-        if self.is_goal():
-            return True  
-
-        explored_states[0] += 1
-
-        for move in self.get_possible_moves():
-            x1, y1, x2, y2 = move
-            self.make_move(x1, y1, x2, y2) 
-            solution_moves.append(move) 
-            
-            if self.dfs(explored_states, solution_moves): 
-                return True 
-            
-            solution_moves.pop()  
-            self.undo_move(x1, y1, x2, y2) 
+        """Génère les déplacements valides à partir de la table de sauts précalculée de la géométrie.
+
+        Avec une base de solutions (load_solution_store), le coup gagnant
+        connu passe d'abord, puis les coups les plus fréquents dans les
+        solutions passées.
+        """
+        past = self.move_history()
+        moves = past.iter_moves if past is not None else self.geometry.iter_moves
+        for _, _, move in moves(self.geometry.encode(self.board)):
+            yield move
+
+    def dfs(self, explored_states, solution_moves, table=None, checkpoint=None, node_limit=None, time_limit=None,
+            split_depth=None, workers=None):
+        """Résout le puzzle en utilisant la recherche en profondeur (DFS) et stocke les mouvements de solution.
+
+        Retourne None si node_limit ou time_limit a interrompu la recherche ;
+        la frontière est alors sauvegardée dans checkpoint et l'appel suivant
+        avec le même checkpoint reprend à partir d'elle. Avec split_depth,
+        l'arbre est découpé à cette profondeur et les sous-arbres sont
+        explorés par workers processus. Une base de solvabilité chargée
+        (load_database) répond d'abord si elle couvre la position.
+        """
+        first = len(solution_moves)
+        if self.database is not None:
+            solved = retrograde.solve_with_database(self.database, self.geometry.encode(self.board), self.goal_state(),
+                                                    explored_states, solution_moves)
+            if solved is not None:
+                if solved:
+                    self.load_solution(solution_moves[first:])
+                return solved
+        if split_depth is not None:
+            self.pruner = None
+            solved = parallel.parallel_dfs(self.geometry, self.geometry.encode(self.board), self.goal_state(), explored_states,
+                                           solution_moves, split_depth, workers, max_entries=self.max_dead_states,
+                                           pruning=self.pruning)
+            if solved:
+                self.load_solution(solution_moves[first:])
+            return solved
+
+        if table is None:
+            table = TranspositionTable(self.geometry, self.goal_state(), self.max_dead_states, self.eviction)
+        self.dead_states = table
+        solved = search.dfs(self.geometry, self.geometry.encode(self.board), self.goal_state(), explored_states, solution_moves,
+                            table, checkpoint, node_limit, time_limit, pruner=self.make_pruner(), observer=self.observer,
+                            history=self.move_history())
+        if solved:
+            self.load_solution(solution_moves[first:])
+        return solved
+
+    def bidirectional_search(self, explored_states, solution_moves, max_states=1_000_000, node_limit=None, time_limit=None):
+        """Résout le puzzle en faisant rejoindre une DFS depuis le départ et une recherche arrière depuis la cible (bornée à max_states états)."""
+        first = len(solution_moves)
+        table = TranspositionTable(self.geometry, self.goal_state(), self.max_dead_states, self.eviction)
+        self.dead_states = table
+        solved = search.bidirectional_search(self.geometry, self.geometry.encode(self.board), self.goal_state(), explored_states,
+                                             solution_moves, table, self.make_pruner(), max_states, observer=self.observer,
+                                             node_limit=node_limit, time_limit=time_limit)
+        if solved:
+            self.load_solution(solution_moves[first:])
+        return solved
+
+    def load_solution_store(self, path):
+        """Ouvre (ou crée) une base de solutions (voir history.py), enrichie à chaque solution trouvée."""
+        self.solutions = history.SolutionStore(path)
+        self.history = None
+
+    def move_history(self):
+        """Historique de la cible courante tiré de la base de solutions, ou None sans base."""
+        if self.solutions is None:
+            return None
+        if self.history is None or self.history.goal != self.goal_state():
+            self.history = self.solutions.load(self.geometry, self.goal_state())
+        return self.history
+
+    def load_database(self, path):
+        """Charge une base de solvabilité construite par retrograde.py."""
+        self.database = retrograde.SolvabilityDatabase(path, self.geometry)
+
+    def is_solvable(self):
+        """True/False selon que la cible reste atteignable depuis le plateau courant, None sans base qui le couvre."""
+        if self.database is None:
+            return None
+        return self.database.solvable(self.geometry.encode(self.board), self.goal_state())
+
+    def next_winning_move(self):
+        """Un coup (x1, y1, x2, y2) qui garde la cible atteignable d'après la base, ou None."""
+        if not self.is_solvable():
+            return None
+        return self.database.winning_move(self.geometry.encode(self.board), self.goal_state())[2]
+
+    def solve(self, algorithm="dfs", time_limit=None, node_limit=None, heuristic=None, width=1000, weight=2.0):
+        """Résout depuis le plateau courant, laissé intact, avec algorithm (voir batch.ALGORITHMS) ; retourne un search.SolveResult."""
+        explored_states = [0]
+        solution_moves = []
+        stats = {}
+        limits = {"node_limit": node_limit, "time_limit": time_limit}
+        board, moves = [row[:] for row in self.board], self.moves[:]
+        started = time.perf_counter()
+        if algorithm == "dfs":
+            solved = self.dfs(explored_states, solution_moves, **limits)
+        elif algorithm == "bidir":
+            solved = self.bidirectional_search(explored_states, solution_moves, **limits)
+        elif algorithm == "layer":
+            solved = self.layer_search(explored_states, solution_moves, stats=stats, **limits)
+        elif algorithm in self.DEFAULT_HEURISTICS:
+            heuristic = heuristic or self.DEFAULT_HEURISTICS[algorithm]
+            if algorithm == "beam":
+                solved = self.beam_search(explored_states, solution_moves, heuristic, width, stats=stats, **limits)
+            elif algorithm == "layerbeam":
+                solved = self.layer_search(explored_states, solution_moves, heuristic, width, stats=stats, **limits)
+            elif algorithm == "wastar":
+                solved = self.weighted_a_star(explored_states, solution_moves, heuristic, weight, stats=stats,
+                                              **limits)
+            else:
+                method = {"gbfs": self.greedy_best_first_search, "astar": self.a_star_search,
+                          "idastar": self.ida_star_search}[algorithm]
+                solved = method(explored_states, solution_moves, heuristic, **limits)
+        else:
+            raise ValueError(f"Algorithme inconnu : {algorithm!r}")
+        elapsed = time.perf_counter() - started
+        self.board, self.moves = board, moves
+        partial = {key: stats[key] for key in search.PARTIAL_KEYS} if "pegs" in stats else None
+        return search.SolveResult(algorithm, heuristic, solved, solution_moves, explored_states[0], elapsed, partial)
+
+    def goal_state(self):
+        """Retourne le bitboard de l'état cible (une seule bille sur final_target)."""
+        return self.geometry.bit(*self.final_target)
+
+    def make_pruner(self):
+        """Crée le Pruner de la cible si l'élagage est activé (self.pruning), et le garde dans self.pruner."""
+        self.pruner = Pruner(self.geometry, self.goal_state()) if self.pruning else None
+        return self.pruner
+
+    def report_pruning(self):
+        """Affiche les compteurs du dernier Pruner utilisé."""
+        if self.pruner is None:
+            return
+        if self.pruner.rejected:
+            print("La cible est inatteignable depuis cette position (classe de position ou pagode).")
+        else:
+            print(f"Élagage : {self.pruner.pruned} états coupés.")
 
-        return False
+    def load_solution(self, solution_moves):
+        """Place le plateau et l'historique des coups dans l'état atteint par la solution."""
+        if self.solutions is not None:
+            self.solutions.record(self.geometry, self.geometry.encode(self.board), self.goal_state(), solution_moves)
+            self.history = None
+        self.board = self.geometry.decode(self.goal_state())
+        self.moves = [((x1, y1), (x2, y2)) for x1, y1, x2, y2 in solution_moves]
 
     def heuristic(self):
         """Fonction heuristique : Pénalise la distance des pions par rapport à la cible finale."""
         target_x, target_y = self.final_target
         distance_sum = 0
-        for x in range(7):
-            for y in range(7):
-                if self.board[x][y] == 1:
-                    distance_sum += abs(x - target_x) + abs(y - target_y)
+        for x, y in self.geometry.cells:
+            if self.board[x][y] == 1:
+                distance_sum += abs(x - target_x) + abs(y - target_y)
         return distance_sum + sum(row.count(1) for row in self.board)
 
 
-    def greedy_best_first_search(self, explored_states, solution_moves):
+    def get_heuristic(self, name):
+        """Construit l'heuristique enregistrée sous name (voir heuristics.HEURISTICS)."""
+        return get_heuristic(name, self.geometry, self.final_target)
+
+    def greedy_best_first_search(self, explored_states, solution_moves, heuristic="distance", node_limit=None, time_limit=None):
         """Résout le puzzle en utilisant la recherche gloutonne (GBFS) et stocke les mouvements de solution."""
-        pq = []
-        visited = set()
-        initial_state = ([row[:] for row in self.board], [])
-        heappush(pq, (self.heuristic(), initial_state))  # (heuristic, (board, moves))
-        
-        while pq:
-            _, (current_board, current_moves) = heappop(pq)
-            self.board = [row[:] for row in current_board]
-            self.moves = current_moves[:]
-            
-            if self.is_goal():
-                solution_moves.extend(current_moves)  
-                return True
-            
-            explored_states[0] += 1
-            board_tuple = tuple(tuple(row) for row in self.board)
-            if board_tuple in visited:
-                continue
-            
-            visited.add(board_tuple)
-            
-            for move in self.get_possible_moves():
-                x1, y1, x2, y2 = move
-                self.make_move(x1, y1, x2, y2)
-                new_state = ([row[:] for row in self.board], self.moves[:] + [move])
-                heappush(pq, (self.heuristic(), new_state))
-                self.undo_move(x1, y1, x2, y2)
-        
-        return False
-
-    def a_star_search(self, explored_states, solution_moves):
+        first = len(solution_moves)
+        state = self.geometry.encode(self.board)
+        solved = search.greedy_best_first_search(self.geometry, state, self.goal_state(), self.get_heuristic(heuristic), explored_states, solution_moves,
+                                                 self.make_pruner(), observer=self.observer,
+                                                 node_limit=node_limit, time_limit=time_limit, memory_limit=self.memory_limit)
+        if solved:
+            self.load_solution(solution_moves[first:])
+        return solved
+
+    def a_star_search(self, explored_states, solution_moves, heuristic="distance", node_limit=None, time_limit=None):
         """Résout le puzzle en utilisant A* et stocke les mouvements de solution."""
-        pq = []
-        visited = set()
-        initial_state = ([row[:] for row in self.board], [], 0)  
-        heappush(pq, (self.heuristic() + 0, initial_state))  # (heuristic + cost, (board, moves, cost))
-        
-        while pq:
-            _, (current_board, current_moves, cost) = heappop(pq)
-            self.board = [row[:] for row in current_board]
-            self.moves = current_moves[:]
-            
-            if self.is_goal():
-                solution_moves.extend(current_moves)  
-                return True
-            
-            explored_states[0] += 1
-            board_tuple = tuple(tuple(row) for row in self.board)
-            if board_tuple in visited:
-                continue
-            
-            visited.add(board_tuple)
-            
-            for move in self.get_possible_moves():
-                x1, y1, x2, y2 = move
-                self.make_move(x1, y1, x2, y2)
-                new_cost = cost + 1  
-                new_state = ([row[:] for row in self.board], self.moves[:] + [move], new_cost)
-                heappush(pq, (new_cost + self.heuristic(), new_state))
-                self.undo_move(x1, y1, x2, y2)
-        
-        return False
+        first = len(solution_moves)
+        state = self.geometry.encode(self.board)
+        solved = search.a_star_search(self.geometry, state, self.goal_state(), self.get_heuristic(heuristic), explored_states, solution_moves,
+                                      self.make_pruner(), observer=self.observer,
+                                      node_limit=node_limit, time_limit=time_limit, memory_limit=self.memory_limit)
+        if solved:
+            self.load_solution(solution_moves[first:])
+        return solved
     
             
+    def beam_search(self, explored_states, solution_moves, heuristic="distance", width=1000, node_limit=None, time_limit=None,
+                    stats=None):
+        """Recherche en faisceau de largeur width ; sans atteindre la cible, solution_moves reçoit la meilleure réponse partielle."""
+        first = len(solution_moves)
+        state = self.geometry.encode(self.board)
+        solved = search.beam_search(self.geometry, state, self.goal_state(), self.get_heuristic(heuristic), explored_states, solution_moves,
+                                    width, self.make_pruner(), stats, observer=self.observer,
+                                    node_limit=node_limit, time_limit=time_limit)
+        if solved:
+            self.load_solution(solution_moves[first:])
+        return solved
+
+    def layer_search(self, explored_states, solution_moves, heuristic="distance", width=None, node_limit=None, time_limit=None,
+                     stats=None):
+        """Parcours par couches vectorisé (NumPy) : en largeur sans width, en faisceau de width états avec l'heuristique sinon."""
+        first = len(solution_moves)
+        state = self.geometry.encode(self.board)
+        heuristic = self.get_heuristic(heuristic) if width is not None else None
+        solved = vectorized.layer_search(self.geometry, state, self.goal_state(), explored_states, solution_moves, width,
+                                         heuristic, self.make_pruner(), stats, observer=self.observer,
+                                         node_limit=node_limit, time_limit=time_limit)
+        if solved:
+            self.load_solution(solution_moves[first:])
+        return solved
+
+    def weighted_a_star(self, explored_states, solution_moves, heuristic="distance", weight=2.0, node_limit=None,
+                        time_limit=None, stats=None):
+        """A* pondéré qui rend la meilleure réponse partielle trouvée quand un budget l'arrête (voir search.report_partial)."""
+        first = len(solution_moves)
+        state = self.geometry.encode(self.board)
+        solved = search.weighted_a_star(self.geometry, state, self.goal_state(), self.get_heuristic(heuristic), explored_states,
+                                        solution_moves, weight, self.make_pruner(), stats, observer=self.observer,
+                                        node_limit=node_limit, time_limit=time_limit, memory_limit=self.memory_limit)
+        if solved:
+            self.load_solution(solution_moves[first:])
+        return solved
+
+    def ida_star_search(self, explored_states, solution_moves, heuristic="pagoda", node_limit=None, time_limit=None):
+        """Résout le puzzle en utilisant IDA* (mémoire linéaire en la profondeur) et stocke les mouvements de solution."""
+        first = len(solution_moves)
+        state = self.geometry.encode(self.board)
+        solved = search.ida_star_search(self.geometry, state, self.goal_state(), self.get_heuristic(heuristic), explored_states, solution_moves,
+                                        self.make_pruner(), observer=self.observer,
+                                        node_limit=node_limit, time_limit=time_limit)
+        if solved:
+            self.load_solution(solution_moves[first:])
+        return solved
+
     def log_moves(self, solution_moves, algorithm_name):
-        """Reconstitue et enregistre l'évolution du plateau en utilisant les mouvements de solution dans un fichier texte."""
+        """Enregistre l'évolution du plateau, rejouée depuis le plateau courant sans le modifier, dans un fichier texte."""
         filename = f"{algorithm_name}_moves.txt"
-        
         with open(filename, "w") as file:
-            file.write("Plateau initial :\n")
-            file.write(self.draw_board() + "\n")  
-
-            for move in solution_moves:
-                if len(move) != 4:
-                    continue  
-                x1, y1, x2, y2 = move
-                file.write(f"\nMouvement: {x1, y1} -> {x2, y2}\n")
-                self.make_move(x1, y1, x2, y2)  
-                file.write(self.draw_board() + "\n")  
-
+            AsciiWriter(file, self.geometry).write(self.geometry.encode(self.board), solution_moves)
         print(f"Évolution de la solution enregistrée dans {filename}")
-        
+
     def draw_board(self):
         """Retourne une chaîne représentant l'état actuel du plateau."""
         return "\n".join(' '.join(['.' if cell == -1 else 'O' if cell == 1 else ' ' for cell in row]) for row in self.board)
@@ -219,16 +374,7 @@ class SolitaireChinois:
 
     def reset_board(self):
         """Réinitialise le plateau à la configuration initiale."""
-        self.board = [
-            [-1, -1, 1, 1, 1, -1, -1],
-            [-1, -1, 1, 1, 1, -1, -1],
-            [1, 1, 1, 1, 1, 1, 1],
-            [1, 1, 1, 1, 1, 1, 1],
-            [1, 1, 1, 1, 1, 1, 1],
-            [-1, -1, 1, 1, 1, -1, -1],
-            [-1, -1, 1, 1, 1, -1, -1],
-        ]
-        self.board[self.initial_empty[0]][self.initial_empty[1]] = 0
+        self.board = [row[:] for row in self.initial_board]
         self.moves = []
 
     def solve_and_compare(self):
@@ -243,10 +389,13 @@ class SolitaireChinois:
 
         if solved_dfs:
             print(f"DFS a résolu le puzzle en {dfs_time:.4f} secondes avec {explored_states_dfs[0]} états explorés.")
+            self.report_pruning()
+            print(f"Table des états morts : {self.dead_states.hits} succès, {self.dead_states.misses} échecs.")
             self.reset_board()  
             self.log_moves(solution_moves_dfs,"DFS")
         else:
             print("DFS n'a pas réussi à résoudre le puzzle.")
+            self.report_pruning()
             
         print("\nRésolution avec GBFS...")
         self.reset_board()  
@@ -258,10 +407,12 @@ class SolitaireChinois:
 
         if solved_gbfs:
             print(f"GBFS a résolu le puzzle en {gbfs_time:.4f} secondes avec {explored_states_gbfs[0]} états explorés.")
+            self.report_pruning()
             self.reset_board()  
             self.log_moves(solution_moves_gbfs,"GBFS")
         else:
             print("GBFS n'a pas réussi à résoudre le puzzle.")
+            self.report_pruning()
 
         print("\nRésolution avec A*...")
         self.reset_board()  
@@ -273,17 +424,88 @@ class SolitaireChinois:
 
         if solved_a_star:
             print(f"A* a résolu le puzzle en {a_star_time:.4f} secondes avec {explored_states_a_star[0]} états explorés.")
+            self.report_pruning()
             self.reset_board()  
             self.log_moves(solution_moves_a_star,"A_star")
         else:
             print("A* n'a pas réussi à résoudre le puzzle.")
-
-
-
-
+            self.report_pruning()
+
+
+
+
+
+
+def parse_cell(text):
+    """Lit une position au format 'x,y'."""
+    try:
+        x, y = map(int, text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Position invalide : {text!r} (format attendu : x,y)")
+    return x, y
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solitaire chinois : résolution d'une partie.")
+    parser.add_argument("--start", type=parse_cell,
+                        help="position vide initiale x,y (sans --start ni --board : saisie au clavier et comparaison)")
+    parser.add_argument("--target", type=parse_cell, help="cible finale x,y (par défaut la position vide initiale)")
+    parser.add_argument("--board", help="fichier JSON du plateau de départ (liste de listes : 1 bille, 0 vide, -1 hors plateau)")
+    parser.add_argument("-g", "--geometry", choices=GEOMETRIES, default="english", help="plateau")
+    parser.add_argument("-a", "--algorithm", choices=ALGORITHMS, default="dfs")
+    parser.add_argument("--heuristic", choices=HEURISTICS, help="heuristique de gbfs, astar et idastar")
+    parser.add_argument("--node-limit", type=int, help="budget d'états explorés")
+    parser.add_argument("--time-limit", type=float, help="budget en secondes")
+    parser.add_argument("--memory-limit", type=float, help="budget mémoire en Mio de gbfs et astar (débordement sur disque)")
+    parser.add_argument("--beam-width", type=int, default=1000, help="largeur du faisceau (beam, layerbeam)")
+    parser.add_argument("--weight", type=float, default=2.0, help="poids de l'heuristique (wastar)")
+    parser.add_argument("--solutions", help="base SQLite des solutions passées, qui guide la DFS (voir history.py)")
+    parser.add_argument("--json", action="store_true", help="affiche le résultat en JSON")
+    parser.add_argument("--compare", action="store_true", help="compare DFS, GBFS et A* au lieu de résoudre une fois")
+    args = parser.parse_args(argv)
+
+    board = None
+    if args.board:
+        try:
+            with open(args.board) as file:
+                board = json.load(file)
+        except (OSError, ValueError) as error:
+            parser.error(f"Plateau illisible ({args.board}) : {error}")
+    try:
+        solitaire = SolitaireChinois(GEOMETRIES[args.geometry], args.start, args.target, board)
+    except ValueError as error:
+        parser.error(str(error))
+
+    if args.memory_limit is not None:
+        solitaire.memory_limit = int(args.memory_limit * 2**20)
+    if args.solutions:
+        solitaire.load_solution_store(args.solutions)
+
+    if args.compare or (args.start is None and board is None):
+        solitaire.display_board()
+        solitaire.solve_and_compare()
+        return
+
+    result = solitaire.solve(args.algorithm, args.time_limit, args.node_limit, args.heuristic, args.beam_width, args.weight)
+    if args.json:
+        print(json.dumps(result.as_dict()))
+    elif result.solved:
+        print(f"{args.algorithm} a résolu le puzzle en {result.time:.4f} secondes avec {result.explored_states} états explorés.")
+        for x1, y1, x2, y2 in result.moves:
+            print(f"Mouvement: {x1, y1} -> {x2, y2}")
+    elif result.partial is not None:
+        partial = result.partial
+        print(f"{args.algorithm} n'a pas atteint la cible : meilleure réponse en {len(result.moves)} coups, "
+              f"{partial['pegs']} billes à {partial['distance']} de la cible (écart de {partial['gap']} billes "
+              f"à la borne de {partial['lower_bound']}).")
+        for x1, y1, x2, y2 in result.moves:
+            print(f"Mouvement: {x1, y1} -> {x2, y2}")
+    elif result.interrupted:
+        print(f"{args.algorithm} a été interrompu par son budget après {result.explored_states} états explorés.")
+    else:
+        print(f"{args.algorithm} n'a pas trouvé de solution ({result.explored_states} états explorés).")
+    sys.exit(0 if result.solved else 2 if result.interrupted else 1)
 
 
 if __name__ == "__main__":
-    solitaire = SolitaireChinois()
-    solitaire.display_board()
-    solitaire.solve_and_compare()
+    main()
@@ -0,0 +1,88 @@
+"""Table de transposition des états sans solution pour la DFS.
+
+Un état dont tous les sous-arbres ont échoué est mémorisé sous sa forme
+canonique : le plus petit de ses images par les symétries du plateau qui
+laissent la cible finale en place (une position symétrique d'une position
+perdante est perdante pour la cible symétrique, donc pour la même cible).
+"""
+
+from collections import OrderedDict
+
+EVICTION_POLICIES = ("lru", "fifo")
+
+
+class TranspositionTable:
+    """États prouvés sans solution, avec plafond d'entrées et politique d'éviction."""
+
+    def __init__(self, geometry, goal, max_entries=2_000_000, eviction="lru"):
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"Politique d'éviction inconnue : {eviction!r} (attendu : {', '.join(EVICTION_POLICIES)})")
+        self.geometry = geometry
+        self.symmetries = [sym for sym in geometry.symmetries if geometry.transform(goal, sym) == goal]
+        self.max_entries = max_entries
+        self.eviction = eviction
+        self.entries = OrderedDict() if eviction == "lru" else {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def key(self, state):
+        """Forme canonique de state sous les symétries compatibles avec la cible."""
+        transform = self.geometry.transform
+        return min([transform(state, sym) for sym in self.symmetries], default=state)
+
+    def probe(self, key):
+        """Indique si key est un état déjà prouvé sans solution."""
+        if key in self.entries:
+            self.hits += 1
+            if self.eviction == "lru":
+                self.entries.move_to_end(key)
+            return True
+        self.misses += 1
+        return False
+
+    def store(self, key):
+        """Mémorise key comme sans solution, en évinçant une entrée si la table est pleine."""
+        if len(self.entries) >= self.max_entries:
+            if self.eviction == "lru":
+                self.entries.popitem(last=False)
+            else:
+                del self.entries[next(iter(self.entries))]
+            self.evictions += 1
+        self.entries[key] = None
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """Table locale doublée d'un cache partagé entre processus.
+
+    shared est un multiprocessing.Array("Q", ..., lock=False) utilisé comme
+    cache à correspondance directe : la case key % len(shared) contient
+    key + 1 si key est connu comme mort. Les écritures concurrentes peuvent
+    écraser une entrée, jamais en inventer une, donc le partage reste sûr
+    sans verrou. Réservé aux plateaux de moins de 64 trous.
+    """
+
+    def __init__(self, geometry, goal, shared, max_entries=2_000_000, eviction="lru"):
+        super().__init__(geometry, goal, max_entries, eviction)
+        self.shared = shared
+        self.slots = len(shared)
+        self.shared_hits = 0
+
+    def probe(self, key):
+        """Cherche key dans la table locale puis dans le cache partagé."""
+        if super().probe(key):
+            return True
+        if self.shared[key % self.slots] == key + 1:
+            self.misses -= 1
+            self.hits += 1
+            self.shared_hits += 1
+            return True
+        return False
+
+    def store(self, key):
+        """Mémorise key localement et le publie dans le cache partagé."""
+        super().store(key)
+        self.shared[key % self.slots] = key + 1
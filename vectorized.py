@@ -0,0 +1,185 @@
+"""Développement vectorisé de couches entières de la recherche, avec NumPy.
+
+layer_search() parcourt l'espace couche par couche (une bille de moins à
+chaque couche). Une couche est un tableau d'uint64 et chaque étape
+applique d'un coup tous les sauts de la géométrie à tous ses états : le
+saut est jouable si state & masque == prérequis et s'applique par
+state ^ masque, comme dans Geometry.iter_moves(). Les enfants sont
+dédoublonnés par np.unique sur leur forme canonique (symétries qui fixent
+la cible), élagués par les pagodes du Pruner et, en mode faisceau, réduits
+à leurs width meilleurs selon l'heuristique. Pagodes, heuristique et
+symétries sont évaluées avec les tables d'octets de la géométrie.
+
+Chaque couche garde ses états et l'indice de leur parent dans la couche
+précédente : le chemin n'est reconstruit qu'une fois la cible atteinte.
+
+NumPy est facultatif : sans lui, ce module s'importe mais layer_search()
+lève ImportError, et batch.py ne propose pas les modes layer et layerbeam.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from heuristics import distance_weights
+from search import Budget, report, report_quality
+
+CHUNK = 1 << 14  # états développés à la fois (tableau temporaire de CHUNK x sauts uint64)
+
+if np is not None:
+    BYTE = np.uint64(0xFF)
+    SHIFT = np.uint64(8)
+
+
+def lookup(states, tables):
+    """Geometry.lookup() vectorisé : une somme par état de states."""
+    total = None
+    for table in tables:
+        values = table[(states & BYTE).astype(np.intp)]
+        total = values if total is None else total + values
+        states = states >> SHIFT
+    return total
+
+
+class LayerTables:
+    """Sauts et symétries d'une géométrie sous forme de tableaux NumPy."""
+
+    def __init__(self, geometry, goal):
+        if np is None:
+            raise ImportError("Le développement par couches demande NumPy (pip install numpy).")
+        if geometry.size > 64:
+            raise ValueError("Le développement par couches ne gère que les plateaux d'au plus 64 trous.")
+        self.geometry = geometry
+        self.masks = np.array([mask for mask, _, _ in geometry.moves], dtype=np.uint64)
+        self.pres = np.array([pre for _, pre, _ in geometry.moves], dtype=np.uint64)
+        self.moves = {(mask, pre): move for mask, pre, move in geometry.moves}
+        self.symmetries = [np.array(symmetry, dtype=np.uint64) for symmetry in geometry.symmetries
+                           if geometry.transform(goal, symmetry) == goal]
+
+    def tables(self, values):
+        """Tables d'octets de values (voir Geometry.byte_tables()), pour lookup()."""
+        return np.array(self.geometry.byte_tables(values), dtype=np.int64)
+
+    def expand(self, layer):
+        """Enfants de tous les états de layer, avec l'indice de leur parent dans layer."""
+        children, parents = [], []
+        for start in range(0, len(layer), CHUNK):
+            block = layer[start:start + CHUNK, None]
+            rows, columns = np.nonzero(block & self.masks == self.pres)
+            children.append(block[rows, 0] ^ self.masks[columns])
+            parents.append(rows + start)
+        return np.concatenate(children), np.concatenate(parents)
+
+    def canonical(self, states):
+        """Plus petite image de chaque état par les symétries qui fixent la cible."""
+        keys = states
+        for symmetry in self.symmetries:
+            keys = np.minimum(keys, lookup(states, symmetry))
+        return keys
+
+    def path(self, layers, node):
+        """Coups menant de la racine au nœud node de la dernière couche de layers."""
+        path = []
+        for depth in range(len(layers) - 1, 0, -1):
+            states, parents = layers[depth]
+            parent = int(parents[node])
+            before = int(layers[depth - 1][0][parent])
+            mask = before ^ int(states[node])
+            path.append(self.moves[mask, before & mask])
+            node = parent
+        path.reverse()
+        return path
+
+
+def layer_search(geometry, state, goal, explored_states, solution_moves, width=None, heuristic=None, pruner=None,
+                 stats=None, observer=None, node_limit=None, time_limit=None):
+    """Parcours en largeur (width=None) ou en faisceau de width états par couche, vectorisé.
+
+    En largeur, la recherche est complète et retourne False si aucune
+    couche n'atteint la cible. En faisceau, les enfants sont classés par
+    heuristic ; sans atteindre la cible, la recherche retourne False si
+    aucune couche n'a été coupée, sinon None en laissant sa meilleure
+    réponse partielle dans solution_moves (voir search.report_partial()).
+    Un budget épuisé donne aussi None. Les budgets ne sont vérifiés qu'entre deux
+    couches : une couche entamée est toujours finie.
+    """
+    tables = LayerTables(geometry, goal)
+    if pruner is None and heuristic is not None:
+        pruner = heuristic.pruner
+    if pruner is not None and not pruner.solvable(state):
+        return False
+    if state == goal:
+        return True
+    scores = tables.tables(heuristic.weights) if width is not None else None
+    pagodas = [(tables.tables(pagoda.weights), bound) for pagoda, bound in pruner.pagodas] if pruner is not None else []
+    target = np.uint64(goal)
+    layer = np.array([state], dtype=np.uint64)
+    layers = [(layer, None)]
+    stored = 1
+    peak = 1
+    duplicates = 0
+    truncated = False
+    base = explored_states[0]
+    if observer is not None:
+        observer.start("layer")
+    budget = Budget(base, node_limit, time_limit, observer)
+    check_at = budget.first
+
+    def counters():
+        pruned = pruner.pruned if pruner is not None else 0
+        return {"expanded": explored_states[0] - base, "generated": stored - 1 + duplicates + pruned,
+                "duplicates": duplicates, "depth": len(layers) - 1, "frontier": peak}
+
+    while len(layer):
+        explored_states[0] += len(layer)
+        children, parents = tables.expand(layer)
+        hits = np.flatnonzero(children == target)
+        if len(hits):
+            solution_moves.extend(tables.path(layers + [(children, parents)], hits[0]))
+            report(stats, peak, stored)
+            if observer is not None:
+                observer.done(True, **counters())
+            return True
+
+        _, first = np.unique(tables.canonical(children), return_index=True)
+        duplicates += len(children) - len(first)
+        children, parents = children[first], parents[first]
+        if pagodas:
+            alive = np.ones(len(children), dtype=bool)
+            for weights, bound in pagodas:
+                alive &= lookup(children, weights) >= bound
+            pruner.pruned += len(children) - int(np.count_nonzero(alive))
+            children, parents = children[alive], parents[alive]
+        if width is not None and len(children) > width:
+            best = np.argpartition(lookup(children, scores), width - 1)[:width]
+            children, parents = children[best], parents[best]
+            truncated = True
+
+        layer = children
+        layers.append((children, parents.astype(np.uint32)))
+        stored += len(children)
+        peak = max(peak, len(children))
+        if explored_states[0] >= check_at:
+            check_at = budget.check(explored_states[0], counters)
+            if check_at is None:
+                break
+
+    report(stats, peak, stored)
+    solved = None if truncated or len(layer) else False
+    if observer is not None:
+        observer.done(solved, **counters())
+    if solved is None:
+        report_layer_partial(tables, layers, goal, solution_moves, stats)
+    return solved
+
+
+def report_layer_partial(tables, layers, goal, solution_moves, stats):
+    """search.report_partial() pour layer_search() : le meilleur état de la dernière couche non vide."""
+    geometry = tables.geometry
+    weights = distance_weights(geometry, *geometry.cells[goal.bit_length() - 1])
+    depth = max(depth for depth, (states, _) in enumerate(layers) if len(states))
+    states = layers[depth][0]
+    node = int(np.argmin(lookup(states, tables.tables(weights))))
+    solution_moves.extend(tables.path(layers[:depth + 1], node))
+    report_quality(geometry, int(states[node]), int(layers[0][0][0]), goal, stats)